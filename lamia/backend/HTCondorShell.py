@@ -30,7 +30,7 @@ import sys  # XXX
 #import pylab
 # uncomment this and few lines below for @graphviz-graph-drawing
 #from networkx.drawing.nx_agraph import graphviz_layout, to_agraph
-import lamia.backend.interface
+import lamia.backend.interface, lamia.core.configuration
 
 # HTCondor job ID syntax, ususally consisting of <clusterID>.<ProcessID>
 rxsJID = r'\d+\.\d+'
@@ -54,6 +54,15 @@ gDefaults = {
         }
     }
 
+# Configuration entries used by job submission (all required); retrieved
+# once per back-end, on first submission
+HTCondorShellSubmissionConfig = lamia.core.configuration.section_accessor(
+        'HTCondorShellSubmissionConfig', {
+            'condorSubmitExec' : ( 'execs.condorSubmit', str ),
+            'condorSubmitArgs' : ( 'condorSubmit', dict ),
+            'submitAd' : ( 'classAds.submit', dict )
+        })
+
 # Example output of condor_submit_dag:
 #   -----------------------------------------------------------------------
 #   File for submitting this DAG to HTCondor           : alignment/P04phys2/exec/alignment.dag.condor.sub
@@ -216,8 +225,10 @@ class HTCondorShellSubmission(lamia.backend.interface.Submission):
                 , popenKwargs={}
                 , monitoringAPI=None ):
         L = logging.getLogger(__name__)
-        self.condorSubmitExec = cfg['execs.condorSubmit']
-        self.condorSubmitArgs = copy.deepcopy(cfg['condorSubmit'])
+        if not isinstance(cfg, HTCondorShellSubmissionConfig):
+            cfg = HTCondorShellSubmissionConfig.from_config(cfg)
+        self.condorSubmitExec = cfg.condorSubmitExec
+        self.condorSubmitArgs = copy.deepcopy(cfg.condorSubmitArgs)
         self.condorSubmitArgs.update(backendArguments)
         for k in ['queue', 'terse', 'batch-name', 'output', 'error']:
             v = self.condorSubmitArgs.pop(k, None)
@@ -227,7 +238,7 @@ class HTCondorShellSubmission(lamia.backend.interface.Submission):
                         ' programmatically, by back-end instance.'%(k,
                             '="%s"'%str(v) if v else '') )
         super().__init__(jobName, cmd, nProcs)
-        baseAd = copy.deepcopy( cfg['classAds.submit'] )
+        baseAd = copy.deepcopy(cfg.submitAd)
         baseAd.update({
                 'output' : stdout.format(**self.macros()),
                 'error' : stderr.format(**self.macros()),
@@ -236,7 +247,7 @@ class HTCondorShellSubmission(lamia.backend.interface.Submission):
                 , submissionTag=submissionTag
                 , monitoringAPI=monitoringAPI
                 , jobName=jobName )
-        self.cmd = [ cfg['execs.condorSubmit'], self.submissionFilePath
+        self.cmd = [ cfg.condorSubmitExec, self.submissionFilePath
                , '-terse'
                , '-batch-name', jobName
                ]
@@ -298,6 +309,17 @@ class HTCondorShellBackend(lamia.backend.interface.BatchBackend):
 
     def __init__(self, config, monitoringAPI=None):
         super().__init__(config, monitoringAPI=monitoringAPI)
+        self._submissionCfg = None
+
+    @property
+    def submissionCfg(self):
+        """
+        Submission settings retrieved from the config on first use (see
+        `HTCondorShellSubmissionConfig').
+        """
+        if self._submissionCfg is None:
+            self._submissionCfg = HTCondorShellSubmissionConfig.from_config(self.cfg)
+        return self._submissionCfg
 
     def queue(self, jobName, **kwargs):
         """
@@ -310,7 +332,7 @@ class HTCondorShellBackend(lamia.backend.interface.BatchBackend):
         filename to which we append a `.sub' postfix and use resulting path for
         generating a submission file.
         """
-        return HTCondorShellSubmission( jobName, self.cfg, monitoringAPI=self.monitoringAPI, **kwargs )
+        return HTCondorShellSubmission( jobName, self.submissionCfg, monitoringAPI=self.monitoringAPI, **kwargs )
 
     def dispatch_jobs(self, js, DAGFilePath=None):
         L = logging.getLogger(__name__)
@@ -20,7 +20,7 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import shlex, subprocess, re, logging, sys, copy, time
-import lamia.backend.interface
+import lamia.backend.interface, lamia.core.configuration
 
 # A regex to parse the LSF message about job being successfully submitted:
 rxJSubmitted = re.compile(r'^Job <(?P<jID>\d+)> is submitted to(?: default)? queue <(?P<queue>[^>]+)>\.$')
@@ -56,6 +56,14 @@ gDefaults = {
                   , 'wX' : None }
     }
 
+# Configuration entries used by job submission (all required); retrieved
+# once per back-end, on first submission
+LSFSubmissionConfig = lamia.core.configuration.section_accessor(
+        'LSFSubmissionConfig', {
+            'bsubExec' : ( 'execs.bsub', str ),
+            'bsubArgs' : ( 'bsub', dict )
+        })
+
 # A special shell scrpt template performing
 gShell = """
 #!/bin/bash
@@ -145,8 +153,10 @@ class LSFSubmission(lamia.backend.interface.Submission):
         """
         L = logging.getLogger(__name__)
         # Set up bsub, pre-form/validate data for command line invocation
-        self.bsubExec = cfg['execs.bsub']
-        self.bsubArgs = copy.deepcopy(cfg['bsub'])
+        if not isinstance(cfg, LSFSubmissionConfig):
+            cfg = LSFSubmissionConfig.from_config(cfg)
+        self.bsubExec = cfg.bsubExec
+        self.bsubArgs = copy.deepcopy(cfg.bsubArgs)
         self.bsubArgs.update(backendArguments)
         for k in ['J', 'oo', 'eo', 'o', 'e']:
             v = self.bsubArgs.pop(k, None)
@@ -183,6 +193,17 @@ class LSFBackend(lamia.backend.interface.BatchBackend):
 
     def __init__( self, config ):
         super().__init__(config)
+        self._submissionCfg = None
+
+    @property
+    def submissionCfg(self):
+        """
+        Submission settings retrieved from the config on first use (see
+        `LSFSubmissionConfig').
+        """
+        if self._submissionCfg is None:
+            self._submissionCfg = LSFSubmissionConfig.from_config(self.cfg)
+        return self._submissionCfg
 
     def _bjobs(self, cmd_, popenKwargs={}):
         L = logging.getLogger(__name__)
@@ -253,7 +274,7 @@ class LSFBackend(lamia.backend.interface.BatchBackend):
         return dict(m.groupdict())
 
     def queue( self, jobName, **kwargs ):
-        return LSFSubmission(jobName, self.cfg, **kwargs)
+        return LSFSubmission(jobName, self.submissionCfg, **kwargs)
 
     def dispatch_jobs(self, j):
         assert( isinstance(j, LSFSubmission) )
@@ -47,14 +47,68 @@ collections within `Configuration' object. Examples:
 
 import yaml, dpath.util, copy, collections, logging, sys \
      , configparser, json, yaml, re, argparse, inspect \
-     , os.path
-import lamia.core.interpolation
+     , os.path, pickle, hashlib, tempfile, time, mmap, weakref, fnmatch \
+     , itertools, concurrent.futures, contextvars, threading
+import lamia.core.interpolation, lamia.core.tables
 from io import IOBase
 from urllib.parse import urlparse
-from functools import reduce
+from functools import lru_cache
 
 DPSP = '.'
+# Characters making the dotted path a glob expression to be forwarded to dpath
+gGlobChars = frozenset('*?[]')
+# Number of compiled path accessors kept in cache
+gCompiledPathsCacheSize = 4096
 gSupportedShebangs = set({'// JSON', '# YAML', '; INI'})
+# Use libyaml-based loader when available
+gYAMLLoader = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+
+# Environment variables controlling the on-disk cache of parsed context files:
+#   - directory where cache entries are stored; the cache is disabled unless
+#     it is set (empty string or "off" disables it as well)
+gParseCacheDirEnvVar = 'LAMIA_PARSE_CACHE_DIR'
+#   - maximum cumulative size (bytes) of cache entries; the least recently
+#     used entries are evicted when exceeded
+gParseCacheMaxSizeEnvVar = 'LAMIA_PARSE_CACHE_MAX_SIZE'
+#   - maximum age (seconds) of unused cache entries
+gParseCacheMaxAgeEnvVar = 'LAMIA_PARSE_CACHE_MAX_AGE'
+# Files of size exceeding this threshold (bytes) are indexed by top-level
+# sections that are loaded on demand (see `LazySection')
+gLazySectionsMinSizeEnvVar = 'LAMIA_LAZY_SECTIONS_MIN_SIZE'
+gLazySectionsMinSizeDefault = 4*1024*1024
+# YAML top-level key line (block mapping at column 0)
+gRxYAMLTopKey = re.compile(rb'^(?P<key>[^\s#\'"?!&*%@`|>{\[\-][^:\n]*?):(?:[ \t]|$)', re.M)
+# Any non-blank, non-comment line at column 0
+gRxYAMLTopLine = re.compile(rb'^[^\s#].*$', re.M)
+# YAML features making the sections dependent on each other
+gRxYAMLCrossRefs = re.compile(rb'(?:^|[\s\[{,:])[&*][^\s,\]}]+|^%', re.M)
+# YAML document start/end marks
+gRxYAMLDocMarks = re.compile(rb'^(?:---|\.\.\.)', re.M)
+# Lookup instrumentation (see `ConfigurationStats'); when the environment
+# variable is set, stats are collected and dumped at exit to the file it names
+# (or to stderr, for "-" or "1")
+gStatsEnvVar = 'LAMIA_CONFIG_STATS'
+gStats = None
+# Number of workers loading context files concurrently in `compose_stack()'
+# (0 or 1 disables concurrent loading) and whether the process pool is used
+# instead of threads
+gLoadWorkersEnvVar = 'LAMIA_CONTEXT_LOAD_WORKERS'
+gLoadWorkersDefault = 8
+gLoadProcessesEnvVar = 'LAMIA_CONTEXT_LOAD_PROCESSES'
+# Binary snapshots of the composed configuration stack (see `StackSnapshot')
+gSnapshotMagic = b'LAMIASNP'
+gSnapshotVersion = 1
+gSnapshotExt = '.lsnap'
+# Binary configuration deltas (see `ConfigurationDelta')
+gDeltaMagic = b'LAMIADLT'
+gDeltaExt = '.ldelta'
+# Version of the cache entries format
+gParseCacheVersion = 2
+gParseCacheDefaults = {
+        'dir' : None,
+        'maxSize' : 512*1024*1024,
+        'maxAge' : 30*24*3600
+    }
 
 # Generic validation expression for command-line parameter overriding
 gRxConfExpr=re.compile(r'^~?[A-Za-z_][\w.-]+(?:[+.-~]?=.+)?$')
@@ -72,6 +126,358 @@ gRxConfExprSemantics = {
 class StackTagError(RuntimeError):
     pass
 
+class ReferenceCycleError(RecursionError):
+    """
+    Raised when the "$(value:...)" references of the configuration entries
+    form a cycle. The `chain' attribute is the list of paths forming the
+    cycle (the first and the last ones are the same).
+    """
+    def __init__(self, chain):
+        self.chain = chain
+        super().__init__( 'Reference cycle detected: %s.'%(' -> '.join(chain)) )
+
+class ConfigurationStats(object):
+    """
+    Opt-in instrumentation of the configuration lookups. Counts:
+      - lookups, hits and misses per stack layer; the layer is identified by
+    its depth (counting from the top of the stack) and tag;
+      - lookups per requested path (to find the hot keys);
+      - memoized value hits/misses of `Configuration' lookups;
+      - interpolation invocations per interpolator group and cumulative time
+    spent in `Processor.interpolate_str()'.
+    Enabled with `enable_stats()' or by setting the `gStatsEnvVar' environment
+    variable (then the report is dumped at exit).
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # (depth, tag) -> [lookups, hits, misses]; lookups missed at all the
+        # layers are accounted with (None, None)
+        self.layers = collections.defaultdict(lambda: [0, 0, 0])
+        self.keys = collections.Counter()
+        self.memo = [0, 0]
+        self.interpolations = collections.Counter()
+        self.interpolationTime = 0.
+
+    def layer_lookup(self, depth, tag, hit):
+        e = self.layers[(depth, tag)]
+        e[0] += 1
+        e[1 if hit else 2] += 1
+
+    def as_dict(self):
+        return {
+            'layers' : [ { 'depth' : d, 'tag' : t
+                         , 'lookups' : e[0], 'hits' : e[1], 'misses' : e[2] }
+                         for (d, t), e in sorted( self.layers.items()
+                                          , key=lambda i: (-1 if i[0][0] is None else i[0][0], str(i[0][1])) ) ],
+            'keys' : dict(self.keys.most_common()),
+            'memo' : { 'hits' : self.memo[0], 'misses' : self.memo[1] },
+            'interpolations' : dict(self.interpolations.most_common()),
+            'interpolationTime' : self.interpolationTime
+        }
+
+    def report(self, nKeys=20):
+        """
+        Returns human-readable report string.
+        """
+        lines = [ 'Configuration lookup statistics:'
+                , '  stack layers (depth, tag: lookups/hits/misses):' ]
+        for e in self.as_dict()['layers']:
+            lines.append( '    #%(depth)-3s %(tag)-24s %(lookups)8d %(hits)8d %(misses)8d'%e )
+        lines.append( '  hot keys:' )
+        for k, n in self.keys.most_common(nKeys):
+            lines.append( '    %-40s %8d'%(k, n) )
+        lines.append( '  memoized values: %d hits, %d misses'%tuple(self.memo) )
+        lines.append( '  interpolations (%.6fs total):'%self.interpolationTime )
+        for g, n in self.interpolations.most_common():
+            lines.append( '    %-40s %8d'%(g, n) )
+        return '\n'.join(lines)
+
+    def dump(self, dest):
+        """
+        Writes the report to the given destination: "-" (or "1") for stderr,
+        otherwise a file path (JSON when path ends with ".json").
+        """
+        if dest in ('-', '1'):
+            sys.stderr.write( self.report() + '\n' )
+            return
+        with open(dest, 'w') as f:
+            if dest.endswith('.json'):
+                json.dump( self.as_dict(), f, indent=2 )
+            else:
+                f.write( self.report() + '\n' )
+
+def enable_stats():
+    """
+    Turns on lookup instrumentation; returns the (new or existing) stats
+    object.
+    """
+    global gStats
+    if gStats is None:
+        gStats = ConfigurationStats()
+    return gStats
+
+def disable_stats():
+    """
+    Turns off lookup instrumentation; returns the stats object collected so
+    far (or None).
+    """
+    global gStats
+    s, gStats = gStats, None
+    return s
+
+def _dump_stats_at_exit(dest):
+    if gStats is not None:
+        try:
+            gStats.dump(dest)
+        except OSError as e:
+            logging.getLogger(__name__).error( 'Unable to dump configuration'
+                    ' statistics to "%s": %s'%(dest, str(e)) )
+
+class ParseCache(object):
+    """
+    On-disk cache of parsed context files. Entries are keyed by file's real
+    path, size, modification time and the loader used, and store the parsed
+    object pickled, together with the stamps of the files it includes (see
+    `lamia.core.interpolation.IncludeResolver'), so the entry is dropped
+    when any of them changes. Cache location and eviction policy are defined by the
+    environment variables (see `gParseCache*EnvVar'); the cache is used only
+    when the location is given.
+    Note, that cache directory has to be private: the entries are unpickled
+    on load.
+    """
+    def __init__( self, cacheDir=None, maxSize=None, maxAge=None ):
+        env = os.environ
+        if cacheDir is None:
+            cacheDir = env.get(gParseCacheDirEnvVar, gParseCacheDefaults['dir'])
+        self.cacheDir = os.path.expanduser(cacheDir) if cacheDir not in (None, '', 'off') \
+                        else None
+        self.maxSize = int(env.get(gParseCacheMaxSizeEnvVar, gParseCacheDefaults['maxSize'])) \
+                       if maxSize is None else maxSize
+        self.maxAge = float(env.get(gParseCacheMaxAgeEnvVar, gParseCacheDefaults['maxAge'])) \
+                       if maxAge is None else maxAge
+
+    @property
+    def enabled(self):
+        return self.cacheDir is not None
+
+    def entry_path(self, path, loaderName):
+        """
+        Returns path of the cache entry for given file and loader.
+        """
+        st = os.stat(path)
+        key = repr(( os.path.realpath(path), st.st_size, st.st_mtime_ns
+                   , loaderName, pickle.HIGHEST_PROTOCOL, gParseCacheVersion )).encode()
+        return os.path.join( self.cacheDir
+                           , hashlib.sha1(key).hexdigest() + '.pickle' )
+
+    def get(self, path, loaderName, parser):
+        """
+        Returns parsed content of the file, either from cache, or by invoking
+        the `parser(path)' and caching its result.
+        """
+        L = logging.getLogger(__name__)
+        if not self.enabled:
+            return parser(path)
+        entryPath = self.entry_path(path, loaderName)
+        try:
+            with open(entryPath, 'rb') as f:
+                obj, includes = pickle.load(f)
+            if all( lamia.core.interpolation.file_stamp(p) == s \
+                                            for p, s in includes.items() ):
+                os.utime(entryPath)  # renew entry for LRU eviction
+                L.debug( 'Parsed content of "%s" loaded from cache.'%path )
+                return obj
+            L.debug( 'Included files of "%s" have changed.'%path )
+            self._remove(entryPath)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            L.warning( 'Dropping unreadable cache entry "%s": %s'%(entryPath, str(e)) )
+            self._remove(entryPath)
+        obj = parser(path)
+        includes = lamia.core.interpolation.gIncludes.stamps(path)
+        try:
+            os.makedirs(self.cacheDir, mode=0o700, exist_ok=True)
+            fd, tmpPath = tempfile.mkstemp(dir=self.cacheDir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((obj, includes), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpPath, entryPath)
+            self.evict()
+        except Exception as e:
+            L.warning( 'Unable to cache parsed content of "%s": %s'%(path, str(e)) )
+        return obj
+
+    def _remove(self, entryPath):
+        try:
+            os.remove(entryPath)
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        Removes the outdated entries and the least recently used ones
+        exceeding the size limit.
+        """
+        entries = []
+        now = time.time()
+        for e in os.scandir(self.cacheDir):
+            if not e.name.endswith('.pickle'):
+                continue
+            st = e.stat()
+            if self.maxAge and now - st.st_mtime > self.maxAge:
+                self._remove(e.path)
+                continue
+            entries.append( (st.st_mtime, st.st_size, e.path) )
+        total = sum(e[1] for e in entries)
+        for mtime, size, entryPath in sorted(entries):
+            if total <= self.maxSize:
+                break
+            self._remove(entryPath)
+            total -= size
+
+class LazySection(object):
+    """
+    Top-level section of a large context file that is parsed on first access.
+    Keeps only the real path of the file and the byte range of the section
+    within it; the `Configuration' and path accessors resolve it
+    transparently. Pickled instances do not keep the parsed value, so the
+    index of sections may be stored in the parse cache.
+    """
+    __slots__ = ('path', 'fmt', 'key', 'begin', 'end', 'stamp', '_value')
+
+    def __init__(self, path, fmt, key, begin, end, stamp):
+        self.path, self.fmt, self.key = os.path.realpath(path), fmt, key
+        self.begin, self.end = begin, end
+        self.stamp = stamp
+
+    def __getstate__(self):
+        return (self.path, self.fmt, self.key, self.begin, self.end, self.stamp)
+
+    def __setstate__(self, state):
+        self.path, self.fmt, self.key, self.begin, self.end, self.stamp = state
+
+    @property
+    def value(self):
+        try:
+            return self._value
+        except AttributeError:
+            pass
+        L = logging.getLogger(__name__)
+        st = os.stat(self.path)
+        if (st.st_size, st.st_mtime_ns) != self.stamp:
+            raise RuntimeError( 'File "%s" has been changed after its sections'
+                    ' were indexed.'%self.path )
+        with open(self.path, 'rb') as f:
+            f.seek(self.begin)
+            txt = f.read(self.end - self.begin).decode('utf-8')
+        if 'json' == self.fmt:
+            self._value = json.loads(txt)
+        else:
+            with lamia.core.interpolation.gIncludes.parsing(self.path):
+                self._value = yaml.load(txt, Loader=gYAMLLoader)[self.key]
+        L.debug( 'Section "%s" of "%s" loaded.'%(str(self.key), self.path) )
+        return self._value
+
+def _index_json_sections(path):
+    """
+    Returns dictionary of `LazySection' for each top-level entry of JSON
+    file, or None if file does not contain JSON object.
+    """
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        txt = f.read().decode('utf-8')
+    dec = json.JSONDecoder()
+    isASCII = txt.isascii()
+    # character offset -> byte offset conversion (incremental)
+    pos = [0, 0]
+    def _boff(i):
+        if isASCII:
+            return i
+        pos[1] += len(txt[pos[0]:i].encode('utf-8'))
+        pos[0] = i
+        return pos[1]
+    ws = re.compile(r'\s*')
+    i = ws.match(txt, 0).end()
+    if not txt.startswith('{', i):
+        return None
+    i = ws.match(txt, i + 1).end()
+    sections = {}
+    stamp = (st.st_size, st.st_mtime_ns)
+    while not txt.startswith('}', i):
+        key, i = dec.raw_decode(txt, i)
+        i = ws.match(txt, i).end()
+        if not txt.startswith(':', i):
+            raise ValueError('Malformed JSON object in "%s".'%path)
+        i = ws.match(txt, i + 1).end()
+        begin = _boff(i)
+        _, i = dec.raw_decode(txt, i)
+        sections[key] = LazySection(path, 'json', key, begin, _boff(i), stamp)
+        i = ws.match(txt, i).end()
+        if txt.startswith(',', i):
+            i = ws.match(txt, i + 1).end()
+    return sections
+
+def _index_yaml_sections(path):
+    """
+    Returns dictionary of `LazySection' for each top-level entry of YAML
+    file, or None if file's sections can not be loaded independently
+    (anchors/aliases, multiple documents, directives, flow or non-plain
+    top-level keys).
+    """
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    if not st.st_size:
+        return None
+    with open(path, 'rb') as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if gRxYAMLCrossRefs.search(mm):
+            return None
+        # Only single leading document start mark is allowed
+        marks = [m.start() for m in gRxYAMLDocMarks.finditer(mm)]
+        if marks and marks != [0]:
+            return None
+        keys = list(gRxYAMLTopKey.finditer(mm))
+        if not keys or len(keys) + len(marks) \
+                    != sum(1 for _ in gRxYAMLTopLine.finditer(mm)):
+            return None
+        sections = {}
+        stamp = (st.st_size, st.st_mtime_ns)
+        for n, m in enumerate(keys):
+            end = keys[n + 1].start() if n + 1 < len(keys) else len(mm)
+            key = yaml.load(m.group('key').decode('utf-8'), Loader=gYAMLLoader)
+            sections[key] = LazySection(path, 'yaml', key, m.start(), end, stamp)
+    return sections
+
+def _lazy_sections_enabled(path):
+    minSize = int(os.environ.get( gLazySectionsMinSizeEnvVar
+                                , gLazySectionsMinSizeDefault ))
+    return os.path.getsize(path) >= minSize
+
+def _parse_yaml_file(path):
+    with open(path, 'r') as f, \
+         lamia.core.interpolation.gIncludes.parsing(path):
+        return dict(yaml.load(f, Loader=gYAMLLoader))
+
+def _parse_json_file(path):
+    with open(path) as f:
+        return dict(json.load(f))
+
+def _parse_yaml_file_sections(path):
+    sections = _index_yaml_sections(path)
+    return sections if sections is not None else _parse_yaml_file(path)
+
+def _parse_json_file_sections(path):
+    sections = _index_json_sections(path)
+    return sections if sections is not None else _parse_json_file(path)
+
+def _parse_ini_file(path):
+    iniCfg = configparser.ConfigParser()
+    iniCfg.read(path)
+    return dict(iniCfg._sections)
+
 def parse_context_stream( argsFPath ):
     """
     Accepts file path and parses it into the python dictionary. The following
@@ -86,7 +492,15 @@ def parse_context_stream( argsFPath ):
             file)
         '# YAML' -- for YAML data
         '; INI' -- for INI config.
+    Tabular files (.csv, .jsonl/.ndjson, .npy/.npz) are read column-wise into
+    the `lamia.core.tables.Table' put under the file name stem (so
+    "runs.csv" gives {'runs' : Table}).
+    Stack snapshot files (see `StackSnapshot') are recognized by the
+    extension or by the signature and returned as `StackSnapshot' instance.
     If format is not recognized, raises RuntimeError().
+    Parsed content of files is cached on disk (see `ParseCache'). Top-level
+    sections of large YAML/JSON files are loaded on demand (see
+    `LazySection').
     """
     L = logging.getLogger(__name__)
     cfg = None
@@ -111,22 +525,34 @@ def parse_context_stream( argsFPath ):
         elif '// JSON' == fmt:
             cfg = dict(json.loads(argsText))
         elif '# YAML' == fmt:
-            cfg = yaml.load(argsText)
+            cfg = yaml.load(argsText, Loader=gYAMLLoader)
         else:
             # Impossible stub:
             raise AssertionError('Format recognized, but not being parsed.')
     elif len(argsFPath) > 4 and ('.ini' == argsFPath[-4:] or \
                                  '.cfg' == argsFPath[-4:] or \
                                  '.erb' == argsFPath[-4:]):
-        iniCfg = configparser.ConfigParser()
-        iniCfg.read(argsFPath)
-        cfg = dict(iniCfg._sections)
+        cfg = ParseCache().get(argsFPath, 'ini', _parse_ini_file)
     elif len(argsFPath) > 5 and '.yaml' == argsFPath[-5:]:
-        with open(argsFPath, 'r') as f:
-            cfg = dict(yaml.load(f, Loader=yaml.FullLoader))
+        if _lazy_sections_enabled(argsFPath):
+            cfg = ParseCache().get( argsFPath, 'yaml-sections:' + gYAMLLoader.__name__
+                                  , _parse_yaml_file_sections )
+        else:
+            cfg = ParseCache().get(argsFPath, 'yaml:' + gYAMLLoader.__name__, _parse_yaml_file)
     elif len(argsFPath) > 5 and '.json' == argsFPath[-5:]:
-        with open(argsFPath) as f:
-            cfg = dict(json.load(f))
+        if _lazy_sections_enabled(argsFPath):
+            cfg = ParseCache().get(argsFPath, 'json-sections', _parse_json_file_sections)
+        else:
+            cfg = ParseCache().get(argsFPath, 'json', _parse_json_file)
+    elif lamia.core.tables.table_parser(argsFPath) is not None:
+        stem = os.path.splitext(os.path.basename(argsFPath))[0]
+        parser = lamia.core.tables.table_parser(argsFPath)
+        if lamia.core.tables.parse_numpy_file is parser:
+            cfg = { stem : parser(argsFPath) }
+        else:
+            cfg = { stem : ParseCache().get(argsFPath, 'table', parser) }
+    elif is_snapshot_file(argsFPath):
+        cfg = StackSnapshot.load(argsFPath)
     else:
         pass  # do nothing, leave cfg being `None'
     if cfg is None:
@@ -134,6 +560,121 @@ def parse_context_stream( argsFPath ):
             ' File path: "%s".'%argsFPath )
     return cfg
 
+class PathAccessor(object):
+    """
+    Compiled dotted path. Keeps the pre-split keys tuple and walks the plain
+    dicts and lists directly, without involving `dpath' machinery for
+    non-glob expressions. Instances are immutable and obtained with
+    `compiled_path()' function that caches them.
+    """
+    __slots__ = ('path', 'keys', 'isGlob')
+
+    def __init__(self, pth):
+        self.path = pth
+        self.keys = tuple(pth.split(DPSP))
+        # Empty tokens (e.g. "foo..bar") have no defined meaning for plain
+        # walker, so we leave them for dpath as well.
+        self.isGlob = any( (not k) or (not gGlobChars.isdisjoint(k)) for k in self.keys )
+
+    @staticmethod
+    def _item(c, k):
+        """
+        Retrieves single element from the container. Raises `KeyError' if
+        element does not exist. Numerical tokens are considered as list
+        indexes and as integer keys for dictionaries (YAML may produce
+        those).
+        """
+        if type(c) is LazySection:
+            c = c.value
+        if isinstance(c, collections.Mapping):
+            try:
+                return c[k]
+            except KeyError:
+                if k.lstrip('-').isdigit():
+                    return c[int(k)]
+                raise
+        elif isinstance(c, collections.Sequence) and not isinstance(c, str):
+            try:
+                return c[int(k)]
+            except (ValueError, IndexError):
+                raise KeyError(k)
+        raise KeyError(k)
+
+    def get(self, dct):
+        """
+        Returns element by path or raises `KeyError'.
+        """
+        if self.isGlob:
+            return dpath.util.get( dct, self.path, separator=DPSP )
+        c = dct
+        for k in self.keys:
+            if type(c) is dict and k in c:
+                c = c[k]
+            else:
+                c = PathAccessor._item(c, k)
+        if type(c) is LazySection:
+            return c.value
+        return c
+
+    def has(self, dct):
+        """
+        Returns whether the element exists.
+        """
+        try:
+            self.get(dct)
+        except KeyError:
+            return False
+        return True
+
+    def new(self, dct, val):
+        """
+        Sets the element by path, creating intermediate dictionaries when
+        need.
+        """
+        if self.isGlob:
+            return dpath.util.new( dct, self.path, val, separator=DPSP )
+        c = dct
+        for k in self.keys[:-1]:
+            if type(c) is not dict:
+                # Lists and other containers are handled by dpath
+                return dpath.util.new( dct, self.path, val, separator=DPSP )
+            if k not in c or not isinstance(c[k], (dict, list)):
+                c[k] = {}
+            c = c[k]
+        if type(c) is not dict:
+            return dpath.util.new( dct, self.path, val, separator=DPSP )
+        c[self.keys[-1]] = val
+
+    def delete(self, dct):
+        """
+        Removes the element by path. Raises `KeyError' if element does not
+        exist.
+        """
+        if self.isGlob:
+            if not dpath.util.delete( dct, self.path, separator=DPSP ):
+                raise KeyError(self.path)
+            return
+        c = dct
+        for k in self.keys[:-1]:
+            c = PathAccessor._item(c, k)
+        k = self.keys[-1]
+        if isinstance(c, collections.MutableMapping):
+            del c[k]
+        elif isinstance(c, collections.MutableSequence):
+            try:
+                del c[int(k)]
+            except (ValueError, IndexError):
+                raise KeyError(self.path)
+        else:
+            raise KeyError(self.path)
+
+@lru_cache(maxsize=gCompiledPathsCacheSize)
+def compiled_path(pth):
+    """
+    Returns cached `PathAccessor' instance for given dotted path string.
+    """
+    return PathAccessor(pth)
+
 class ConfigInterpolator(object):
     """
     Config interpolator allows one to refer to the entities that are already
@@ -148,7 +689,43 @@ class ConfigInterpolator(object):
             raise RuntimeError('Got empty config path.')
         elif strval[0] in '@-+':
             raise NotImplementedError("Cfg ops aren't yet supported.")  # TODO
-        return dpath.util.get(self.dct, strval, separator=DPSP)
+        return compiled_path(strval).get(self.dct)
+
+class _SelfInterpolator(ConfigInterpolator):
+    """
+    Self-referencing interpolator of the `Configuration': referenced entries
+    are retrieved interpolated (and memoized) by the configuration itself,
+    so the reference chains are resolved once and the cycles are detected
+    at the first repeated entry (see `Configuration._interpolated()').
+    Results are memoized by the processor (see
+    `lamia.core.interpolation.Processor'); the owning `Configuration'
+    invalidates them on modification.
+    """
+    pure = True
+
+    def __init__(self, cfg, dct):
+        super().__init__(dct)
+        self._cfg = weakref.ref(cfg)
+
+    def __call__(self, strval):
+        if not strval:
+            raise RuntimeError('Got empty config path.')
+        elif strval[0] in '@-+':
+            raise NotImplementedError("Cfg ops aren't yet supported.")  # TODO
+        cfg = self._cfg()
+        if strval not in cfg._memo \
+        and len(getattr(gResolution, 'chain', ())) > gMaxResolutionDepth:
+            # Deep chain: resolve the rest of it in dependency order instead
+            # of the recursion
+            for p in cfg._resolution_order(cfg._referring_strings(strval)):
+                cfg[p]
+        return cfg[strval]
+
+# Per-thread chain of entries being interpolated: {(id(cfg), path) : None}
+gResolution = threading.local()
+# Max length of the chain above which the references are pre-resolved
+# iteratively
+gMaxResolutionDepth = 32
 
 def conf_arg_expr(expr):
     """
@@ -161,12 +738,210 @@ def conf_arg_expr(expr):
     return expr
 
 
+# Digests are 128-bit integers; the mappings and sets digests are derived from
+# the (order-independent) sum of their items digests modulo 2^128
+gDigestMod = 1 << 128
+
+def _h(*parts):
+    return int.from_bytes( hashlib.blake2b(b''.join(parts), digest_size=16).digest()
+                         , 'little' )
+
+def _b(d):
+    return d.to_bytes(16, 'little')
+
+class _NodeDigests(object):
+    """
+    Content digests of the configuration data nodes. Digests of containers
+    are cached by the container identity (the cache keeps the reference, so
+    identity is not reused); for mappings the sum of item digests is kept as
+    well, to update the digest incrementally when single item is changed
+    (see `update()'). Containers modified in place must be forgotten (or
+    updated) by the caller.
+    Uninterpolated values are considered; lazily-loaded sections are
+    identified by the file, position and modification stamp, without
+    loading.
+    """
+    def __init__(self):
+        self._cache = {}
+
+    def __bool__(self):
+        return bool(self._cache)
+
+    def cached(self, c):
+        e = self._cache.get(id(c), None)
+        return e is not None and e[0] is c
+
+    def forget(self, c):
+        e = self._cache.get(id(c), None)
+        if e is not None and e[0] is c:
+            del self._cache[id(c)]
+
+    def clear(self):
+        self._cache.clear()
+
+    def item(self, k, d):
+        return _h( b'i', _b(self(k)), _b(d) )
+
+    def __call__(self, v):
+        t = type(v)
+        if t is str:
+            return _h( b's', v.encode('utf-8', 'surrogatepass') )
+        if t in (int, float, bool) or v is None:
+            return _h( t.__name__.encode(), repr(v).encode() )
+        e = self._cache.get(id(v), None)
+        if e is not None and e[0] is v:
+            return e[1]
+        acc = None
+        if isinstance(v, collections.Mapping):
+            acc = sum( self.item(k, self(vv)) for k, vv in v.items() ) % gDigestMod
+            d = _h( b'd', _b(acc) )
+        elif isinstance(v, (set, frozenset)):
+            d = _h( b'S', _b(sum( self(vv) for vv in v ) % gDigestMod) )
+        elif t is LazySection:
+            d = _h( b'z', repr((v.path, v.key, v.begin, v.end, v.stamp)).encode() )
+        elif t is Stack._Deleted:
+            d = _h( b'x' )
+        elif isinstance(v, lamia.core.tables.Column) and hasattr(v.data, 'tobytes'):
+            d = _h( b'c', str(getattr(v.data, 'dtype', getattr(v.data, 'typecode', ''))).encode()
+                  , v.data.tobytes() )
+        elif isinstance(v, collections.Sequence):
+            hh = hashlib.blake2b(b'l', digest_size=16)
+            for vv in v:
+                hh.update(_b(self(vv)))
+            d = int.from_bytes(hh.digest(), 'little')
+        else:
+            d = _h( b'o', t.__name__.encode(), repr(v).encode() )
+        self._cache[id(v)] = (v, d, acc)
+        return d
+
+    def update(self, old, new, k, oldItem, newChild):
+        """
+        Updates the cached digest of mapping `old' (being replaced by, or
+        modified in place into, `new') after its item `k' was changed:
+        `oldItem' is the digest of the former item (None, if there was no
+        such item) and `newChild' is the digest of the new value (None, if
+        item was deleted). Returns False if mapping was not cached.
+        """
+        e = self._cache.get(id(old), None)
+        if e is None or e[0] is not old or e[2] is None:
+            return False
+        acc = e[2]
+        if oldItem is not None:
+            acc -= oldItem
+        if newChild is not None:
+            acc += self.item(k, newChild)
+        acc %= gDigestMod
+        del self._cache[id(old)]
+        self._cache[id(new)] = (new, _h( b'd', _b(acc) ), acc)
+        return True
+
+_gMissing = object()
+
+def _path_nodes(root, keys):
+    """
+    Walks the data along the keys without resolving lazy sections. Returns
+    the tuple of containers along the path (from root to the parent of the
+    last key), resolved keys and the addressed value (`_gMissing' if it does
+    not exist). If path can not be walked (e.g. intermediate container is
+    missing or is a lazy section), the returned containers list is shorter
+    than keys.
+    """
+    nodes, rKeys, c = [], [], root
+    for k in keys:
+        if type(c) is LazySection or type(c) is Stack._Deleted:
+            return nodes, rKeys, _gMissing
+        nodes.append(c)
+        if isinstance(c, collections.Mapping):
+            if k not in c and type(k) is str \
+            and k.lstrip('-').isdigit() and int(k) in c:
+                k = int(k)
+            rKeys.append(k)
+            if k not in c:
+                return nodes, rKeys, _gMissing
+            c = c[k]
+        elif isinstance(c, (list, tuple)):
+            try:
+                k = int(k)
+                rKeys.append(k)
+                c = c[k]
+            except (ValueError, IndexError):
+                return nodes, rKeys, _gMissing
+        else:
+            nodes.pop()
+            return nodes, rKeys, _gMissing
+    return nodes, rKeys, c
+
+def _digest_at(digests, root, keys):
+    """
+    Returns digest of the value at keys (None, if it does not exist). For
+    the tombstone met along the path, its digest is returned.
+    """
+    c = root
+    for k in keys:
+        if type(c) is Stack._Deleted:
+            break
+        if type(c) is LazySection:
+            c = c.value
+        if isinstance(c, collections.Mapping):
+            if k not in c and type(k) is str \
+            and k.lstrip('-').isdigit() and int(k) in c:
+                k = int(k)
+            if k not in c:
+                return None
+            c = c[k]
+        elif isinstance(c, (list, tuple)):
+            try:
+                c = c[int(k)]
+            except (ValueError, IndexError):
+                return None
+        else:
+            return None
+    return digests(c)
+
+def _readonly(v):
+    """
+    Returns read-only counterpart of the (interpolated) value to be memoized:
+    dicts become `_FrozenDict', lists -- `_ReadOnlyList', sets -- frozensets.
+    Values that are already read-only are returned as is, so the subtrees
+    memoized before are not converted again.
+    """
+    t = type(v)
+    if t is dict:
+        return _FrozenDict( (k, _readonly(e)) for k, e in v.items() )
+    if t is list:
+        return _ReadOnlyList( _readonly(e) for e in v )
+    if t is set:
+        return frozenset(v)
+    return v
+
 class Configuration(collections.MutableMapping):
     """
     Configuration representated as mutable mapping with shortened element
     subscription implemented by `dpath' module.
 
-    TODO: impose support for the dpath's globes.
+    Data is shared structurally with the initializing dict or Configuration
+    instance: no copy is made on construction and the containers along the
+    modified path are copied on the first mutation (copy-on-write). So the
+    dictionary given for initialization is adopted and has to be considered
+    as immutable by the caller afterwards.
+
+    Interpolation is lazy: entries are interpolated on first read and the
+    result is memoized per path. Self-referenced entries (via
+    "$(value:...)") are interpolated and memoized in the same way, so the
+    reference chains are resolved once; the cycles are reported by
+    `ReferenceCycleError'. The memoized results are invalidated when the
+    entry itself, its parent/child or any (transitively) self-referenced
+    entry is set or deleted. To resolve all the references at once, in
+    dependency order, use `resolve_references()'. The memoized dicts, lists
+    and sets are returned as read-only views (see `_readonly()'), so the
+    repeated reads do not copy them; the caller has to copy the value
+    (e.g. by `copy.deepcopy()', which gives plain dicts and lists) prior to
+    modification.
+
+    Glob expressions (e.g. "runs.*.detectors.*.enabled", see `search()') are
+    resolved with the per-instance index of paths, built lazily for the
+    top-level entries being queried; the matching paths are memoized per
+    pattern until the queried entries are modified.
     """
     def __init__( self
                 , initObject={}
@@ -178,10 +953,12 @@ class Configuration(collections.MutableMapping):
         from file by the given path.
         """
         L = logging.getLogger(__name__)
-        if not interpolators:
-            self._interpolators = lamia.core.interpolation.Processor()
-        else:
-            self._interpolators = interpolators
+        if not interpolators and isinstance(initObject, Configuration):
+            # Copy inherits the interpolators of the original
+            interpolators = initObject._interpolators.parent
+        # Own (scoped) processor is created to keep the self-referencing
+        # interpolator local for this instance.
+        self._interpolators = lamia.core.interpolation.Processor(parent=interpolators)
         cfg = {}
         if type(initObject) is str:
             if '\n' not in initObject:
@@ -189,65 +966,571 @@ class Configuration(collections.MutableMapping):
                 if '' == pst.scheme \
                 or 'file' == pst.scheme:
                     cfg = parse_context_stream( pst.path )
+                    if type(cfg) is StackSnapshot:
+                        cfg = cfg.merged()
                 else:
                     raise NotImplementedError( "URI Scheme \"%s\" is not yet supported."%pst.scheme )
             else:
-                cfg = yaml.load(initObject)
+                cfg = yaml.load(initObject, Loader=gYAMLLoader)
         elif isinstance(initObject, IOBase):
-            cfg = yaml.load( initObject )
-        elif type(initObject) is dict:
-            cfg = copy.deepcopy(initObject)
+            cfg = yaml.load( initObject, Loader=gYAMLLoader )
+        elif isinstance(initObject, dict):
+            # Plain dict, or read-only view of the memoized value
+            cfg = initObject
         elif type(initObject) is None:
             initObject = {}
+        elif isinstance(initObject, FrozenConfiguration):
+            cfg = initObject._store
+        elif isinstance(initObject, StackSnapshot):
+            cfg = initObject.merged()
         elif isinstance(initObject, Configuration):
-            cfg = copy.deepcopy(initObject._store)
+            cfg = initObject._store
+            # Since now the data is shared, the original has to copy it prior
+            # to modification as well.
+            initObject._owned.clear()
         elif initObject is None:
             cfg = {}
         else:
             raise TypeError("Unexpected type for Configuration object"
                     " initialization: %s."%type(initObject))
+        if switches:
+            cfg = dict(cfg)
         for k, v in switches.items():
             try:
                 cfg[v[1]] = copy.deepcopy(cfg[k][v[0]])
             except KeyError:
                 L.error( 'Available keys: %s.'%(', '.join(cfg.keys())) )
             del(cfg[k])
-        if selfInterpolationTag:
-            self._interpolators[selfInterpolationTag] = ConfigInterpolator(cfg)
-        else:
-            self._interpolators['value'] = ConfigInterpolator(cfg)
-        interpolated = self._interpolators( cfg )
-        self._store = dict( interpolated )
+        if not selfInterpolationTag and isinstance(initObject, Configuration):
+            # Copy inherits the self-referencing tag of the original
+            selfInterpolationTag = initObject._selfTag
+        self._selfTag = selfInterpolationTag if selfInterpolationTag else 'value'
+        self._selfInterpolator = _SelfInterpolator(self, cfg)
+        self._interpolators[self._selfTag] = self._selfInterpolator
+        self._store = cfg
+        # id -> container, for containers exclusively owned by this instance
+        # (i.e. that may be modified in place)
+        self._owned = {}
+        # path -> interpolated value
+        self._memo = {}
+        # top-level key -> set of (memoized path, watched path keys)
+        self._watch = {}
+        # top-level key -> {depth : {last key (str) : [keys tuples]}}
+        self._globIndex = {}
+        # glob pattern -> list of matching keys tuples
+        self._globMemo = {}
+        # Content digests of the data nodes; shared by instances sharing the
+        # data (see `fingerprint()')
+        self._digests = initObject._digests if isinstance(initObject, Configuration) \
+                        else _NodeDigests()
+        # Marks of the subtrees without interpolation markers; shared as well
+        self._plain = initObject._plain if isinstance(initObject, Configuration) \
+                        else lamia.core.interpolation.PlainMarks()
 
     def __deepcopy__(self, memo):
         return Configuration(self)
 
+    def fingerprint(self, prefix=None):
+        """
+        Returns stable content hash (hex string) of the configuration, or of
+        its subtree at given dotted path. Uninterpolated data is considered.
+        Digests of the subtrees are cached and updated incrementally on
+        modification, so the repeated calls are cheap. Raises KeyError if
+        prefix does not exist.
+        """
+        keys = () if not prefix else compiled_path(prefix).keys
+        d = _digest_at(self._digests, self._store, keys)
+        if d is None:
+            raise KeyError(prefix)
+        return '%032x'%d
+
+    def _memoize(self, pth, val, refs):
+        """
+        Stores interpolated value and registers the paths whose modification
+        shall invalidate it.
+        """
+        self._memo[pth] = val
+        keys = compiled_path(pth).keys if DPSP in pth else (pth,)
+        self._watch.setdefault(keys[0], set()).add( (pth, keys) )
+        for nm, idnt in refs:
+            if nm != self._selfTag:
+                continue
+            rKeys = compiled_path(idnt).keys
+            if compiled_path(idnt).isGlob:
+                rKeys = (None,)
+            self._watch.setdefault(rKeys[0], set()).add( (pth, rKeys) )
+
+    def _invalidate(self, pth):
+        """
+        Drops memoized values affected by modification of entry at given path.
+        """
+        if not self._memo:
+            return
+        if DPSP in pth and compiled_path(pth).isGlob:
+            self._memo.clear()
+            self._watch.clear()
+            return
+        pending = [pth]
+        while pending:
+            pth = pending.pop()
+            keys = compiled_path(pth).keys if DPSP in pth else (pth,)
+            for head in (keys[0], None):
+                watched = self._watch.get(head, None)
+                if not watched:
+                    continue
+                for mPth, wKeys in list(watched):
+                    n = min(len(wKeys), len(keys))
+                    if head is None or wKeys[:n] == keys[:n]:
+                        watched.discard( (mPth, wKeys) )
+                        if self._memo.pop(mPth, _gMissing) is not _gMissing:
+                            # Values referring to the dropped one are
+                            # affected as well
+                            pending.append(mPth)
+
+    def _invalidate_glob_index(self, head=None):
+        """
+        Drops the path index of given top-level entry (or of all entries, if
+        None) and the memoized glob query results that may be affected.
+        """
+        if head is None:
+            self._globIndex.clear()
+            self._globMemo.clear()
+            return
+        self._globIndex.pop(head, None)
+        sHead = str(head)
+        for pattern in list(self._globMemo.keys()):
+            pHead = pattern.split(DPSP, 1)[0]
+            if pHead == '**' or fnmatch.fnmatchcase(sHead, pHead):
+                del self._globMemo[pattern]
+
+    def _path_index(self, head):
+        """
+        Returns (building, if need) index of the paths within top-level entry:
+        dictionary of depth -> last key (as a string) -> list of keys tuples.
+        """
+        idx = self._globIndex.get(head, None)
+        if idx is not None:
+            return idx
+        idx = {}
+        stack = [((head,), self._store[head])]
+        while stack:
+            keys, c = stack.pop()
+            idx.setdefault(len(keys), {}).setdefault(str(keys[-1]), []).append(keys)
+            if type(c) is LazySection:
+                c = c.value
+            if isinstance(c, collections.Mapping):
+                stack.extend( (keys + (k,), v) for k, v in c.items() )
+            elif isinstance(c, (list, tuple)):
+                stack.extend( (keys + (n,), v) for n, v in enumerate(c) )
+        self._globIndex[head] = idx
+        return idx
+
+    @staticmethod
+    def _keys_match(tokens, keys):
+        """
+        Matches the keys tuple against the glob pattern tokens; "**" token
+        matches any number (including zero) of keys.
+        """
+        if not tokens:
+            return not keys
+        if '**' == tokens[0]:
+            return any( Configuration._keys_match(tokens[1:], keys[n:]) \
+                        for n in range(len(keys) + 1) )
+        return bool(keys) \
+           and fnmatch.fnmatchcase(str(keys[0]), tokens[0]) \
+           and Configuration._keys_match(tokens[1:], keys[1:])
+
+    def _glob_matches(self, pattern):
+        """
+        Returns the list of keys tuples matching glob pattern.
+        """
+        try:
+            return self._globMemo[pattern]
+        except KeyError:
+            pass
+        tokens = tuple(pattern.split(DPSP))
+        nRec = tokens.count('**')
+        if '**' == tokens[0]:
+            heads = list(self._store.keys())
+        elif gGlobChars.isdisjoint(tokens[0]) and tokens[0] in self._store:
+            heads = [tokens[0]]
+        else:
+            heads = [ k for k in self._store.keys() \
+                      if fnmatch.fnmatchcase(str(k), tokens[0]) ]
+        matches = []
+        for head in heads:
+            idx = self._path_index(head)
+            if nRec:
+                depths = [ d for d in idx.keys() if d >= len(tokens) - nRec ]
+            else:
+                depths = [len(tokens)] if len(tokens) in idx else []
+            last = tokens[-1]
+            for d in sorted(depths):
+                byLast = idx[d]
+                if '**' == last:
+                    cands = itertools.chain.from_iterable(byLast.values())
+                elif gGlobChars.isdisjoint(last):
+                    cands = byLast.get(last, ())
+                else:
+                    cands = itertools.chain.from_iterable( v for k, v in byLast.items() \
+                                            if fnmatch.fnmatchcase(k, last) )
+                matches.extend( keys for keys in cands \
+                                if Configuration._keys_match(tokens, keys) )
+        self._globMemo[pattern] = matches
+        return matches
+
+    def search(self, pattern):
+        """
+        Returns dictionary of (dotted path -> interpolated value) of the
+        entries matching given glob pattern. Pattern tokens are matched with
+        `fnmatch' rules, the "**" token matches any number of keys. Repeated
+        queries take time proportional to the number of matches.
+        """
+        return { DPSP.join(map(str, keys)) : self._get_keys(keys) \
+                 for keys in self._glob_matches(pattern) }
+
+    def _get_keys(self, keys):
+        """
+        Returns interpolated value addressed by keys tuple.
+        """
+        pth = DPSP.join(map(str, keys))
+        try:
+            return self._memo[pth]
+        except KeyError:
+            pass
+        c = self._store
+        for k in keys:
+            if type(c) is LazySection:
+                c = c.value
+            c = c[k]
+        if type(c) is LazySection:
+            c = c.value
+        return self._interpolated(pth, c)
+
+    def _own(self, c):
+        """
+        Returns the container that may be modified in place: given one if it
+        is owned by this instance, or its shallow copy otherwise.
+        """
+        if id(c) in self._owned:
+            return c
+        if isinstance(c, collections.Mapping):
+            c = dict(c)
+        elif isinstance(c, (list, tuple)):
+            c = list(c)
+        else:
+            raise TypeError('Unable to modify entries of %s.'%type(c).__name__)
+        self._owned[id(c)] = c
+        return c
+
+    def _writable(self, keys, create=True):
+        """
+        Copies (if need) the containers along the path and returns the one
+        which have to be modified to set or delete the last key. Missing
+        intermediate dictionaries are created if `create' is set; raises
+        `KeyError' if non-container entry exists on the path.
+        """
+        if id(self._store) not in self._owned:
+            self._store = self._own(self._store)
+            self._selfInterpolator.dct = self._store
+        c = self._store
+        # Containers along the path are modified in place
+        self._plain.forget(c)
+        for k in keys[:-1]:
+            if isinstance(c, dict):
+                if k not in c and type(k) is str \
+                and k.lstrip('-').isdigit() and int(k) in c:
+                    k = int(k)
+                child = c.get(k, _gMissing)
+                if type(child) is LazySection:
+                    child = child.value
+                if not isinstance(child, (collections.Mapping, list, tuple)):
+                    if not create or child is not _gMissing:
+                        # Only the missing entries are created
+                        raise KeyError(DPSP.join(map(str, keys)))
+                    child = {}
+                    self._owned[id(child)] = child
+                    c[k] = child
+            else:
+                try:
+                    k = int(k)
+                    child = c[k]
+                except (ValueError, IndexError):
+                    raise KeyError(DPSP.join(keys))
+            owned = self._own(child)
+            if owned is not child:
+                c[k] = owned
+            c = owned
+            self._plain.forget(c)
+        return c
+
+    def _set(self, pth, val, delete=False):
+        """
+        Sets or deletes an entry, copying the shared containers along the
+        path.
+        """
+        self._invalidate(pth)
+        self._interpolators.invalidate(self._selfTag)
+        if DPSP in pth and compiled_path(pth).isGlob:
+            # Globs are forwarded to dpath on private copy of the data
+            self._invalidate_glob_index()
+            self._digests = _NodeDigests()
+            self._plain = lamia.core.interpolation.PlainMarks()
+            self._store = copy.deepcopy(self._store)
+            self._owned = { id(self._store) : self._store }
+            self._selfInterpolator.dct = self._store
+            if delete:
+                compiled_path(pth).delete(self._store)
+            else:
+                compiled_path(pth).new(self._store, val)
+            return
+        self._set_keys( compiled_path(pth).keys if DPSP in pth else (pth,)
+                      , val, delete=delete )
+
+    def _set_keys(self, keys, val, delete=False):
+        """
+        Sets or deletes an entry addressed by the sequence of keys (that,
+        unlike the dotted path, may be of any hashable type). Does not
+        invalidate the memoized values (except for the glob queries).
+        """
+        if self._globIndex or self._globMemo:
+            self._invalidate_glob_index(keys[0])
+        if not self._digests:
+            return self._set_keys_nodigest(keys, val, delete)
+        # Update the cached digests along the path incrementally
+        dg = self._digests
+        nodes, rKeys, leaf = _path_nodes(self._store, keys)
+        regular = len(nodes) == len(keys) \
+              and all(isinstance(c, collections.Mapping) for c in nodes)
+        oldItems = []
+        if regular:
+            for n, c in enumerate(nodes):
+                if not dg.cached(c):
+                    oldItems.append(False)
+                    continue
+                child = nodes[n + 1] if n + 1 < len(nodes) else leaf
+                oldItems.append( None if child is _gMissing else dg.item(rKeys[n], dg(child)) )
+        try:
+            self._set_keys_nodigest(keys, val, delete)
+        finally:
+            nNodes, nRKeys, nLeaf = _path_nodes(self._store, keys)
+            if not regular or len(nNodes) != len(keys) or nRKeys != rKeys:
+                for c in itertools.chain(nodes, nNodes):
+                    dg.forget(c)
+            else:
+                childD = None
+                if oldItems[-1] is not False and nLeaf is not _gMissing:
+                    childD = dg(nLeaf)
+                for n in reversed(range(len(keys))):
+                    if oldItems[n] is False \
+                    or not dg.update(nodes[n], nNodes[n], rKeys[n], oldItems[n], childD):
+                        dg.forget(nodes[n])
+                        dg.forget(nNodes[n])
+                    if n and oldItems[n - 1] is not False:
+                        childD = dg(nNodes[n])
+
+    def _set_keys_nodigest(self, keys, val, delete):
+        """
+        Performs the modification for `_set_keys()'.
+        """
+        c = self._writable(keys, create=not delete)
+        k = keys[-1]
+        if isinstance(c, dict):
+            if k not in c and type(k) is str \
+            and k.lstrip('-').isdigit() and int(k) in c:
+                k = int(k)
+            if delete:
+                del c[k]
+            else:
+                c[k] = val
+            return
+        try:
+            k = int(k)
+            if delete:
+                del c[k]
+            elif k == len(c):
+                c.append(val)
+            else:
+                c[k] = val
+        except (ValueError, IndexError):
+            raise KeyError(DPSP.join(map(str, keys)))
+
     def __contains__(self, k):
         if DPSP in k:
-            try:
-                dpath.util.get( self._store, k, separator=DPSP )
-            except KeyError:
-                return False
-            return True
+            if compiled_path(k).isGlob:
+                return bool(self._glob_matches(k))
+            return compiled_path(k).has(self._store)
         else:
-            return k in self._store.keys()
+            return k in self._store
 
     def __getitem__(self, pth):
+        try:
+            ret = self._memo[pth]
+            if gStats is not None:
+                gStats.memo[0] += 1
+            return ret
+        except KeyError:
+            pass
+        if gStats is not None:
+            gStats.memo[1] += 1
         ret = None
         if DPSP in pth:
-            ret = dpath.util.get( self._store, pth, separator=DPSP )
+            if compiled_path(pth).isGlob:
+                # Like dpath.util.get(), requires single match
+                matches = self._glob_matches(pth)
+                if not matches:
+                    raise KeyError(pth)
+                if len(matches) > 1:
+                    raise ValueError( 'Glob "%s" matches %d entries.'%(pth, len(matches)) )
+                return self._get_keys(matches[0])
+            ret = compiled_path(pth).get(self._store)
         else:
-            ret = dict.__getitem__(self._store, pth)
-        return self._interpolators(ret)
+            ret = self._store[pth]
+            if type(ret) is LazySection:
+                ret = ret.value
+        return self._interpolated(pth, ret)
 
-    def __setitem__(self, pth, val):
-        if DPSP in pth:
-            dpath.util.new( self._store, pth, val, separator=DPSP )
+    def _interpolated(self, pth, ret):
+        """
+        Interpolates the raw value and memoizes the result for given path.
+        """
+        chain = getattr(gResolution, 'chain', None)
+        if chain is None:
+            chain = gResolution.chain = {}
+        key = (id(self), pth)
+        if key in chain:
+            names = [ p for i, p in chain if i == key[0] ]
+            raise ReferenceCycleError( names[names.index(pth):] + [pth] )
+        chain[key] = None
+        # References made by the nested interpolations are tracked by the
+        # memoized entries they produce
+        outer = self._interpolators.tracked
+        self._interpolators.tracked = refs = set()
+        try:
+            ret = self._interpolators(ret, self._plain)
+        finally:
+            self._interpolators.tracked = outer
+            del chain[key]
+        ret = _readonly(ret)
+        self._memoize(pth, ret, refs)
+        return ret
+
+    def _references(self, v):
+        """
+        Returns set of paths referenced by the string value via the
+        self-referencing interpolator. References with nested
+        interpolations (known only at run time) are omitted.
+        """
+        refs = set()
+        for seg in lamia.core.interpolation.compiled_template(v):
+            if type(seg) is not str and seg[0] == self._selfTag and '$(' not in seg[1]:
+                refs.add(seg[1])
+        return refs
+
+    def _referring_strings(self, pth=None):
+        """
+        Returns list of (path, referenced paths) pairs for the not yet
+        memoized strings with self-references located at (or under) the given
+        path (within whole configuration, if path is not given). Lazily
+        loaded sections met are loaded.
+        """
+        if pth is None:
+            stack = [((), self._store)]
         else:
-            self._store[pth] = val
+            try:
+                stack = [(tuple(compiled_path(pth).keys), compiled_path(pth).get(self._store))]
+            except KeyError:
+                return []
+        ret = []
+        while stack:
+            keys, v = stack.pop()
+            if type(v) is LazySection:
+                v = v.value
+            if isinstance(v, collections.Mapping):
+                items = v.items()
+            elif isinstance(v, (list, tuple)):
+                items = enumerate(v)
+            else:
+                if type(v) is str and '$(' in v:
+                    p = DPSP.join(keys)
+                    refs = self._references(v)
+                    if refs and p not in self._memo:
+                        ret.append( (p, refs) )
+                continue
+            for k, c in items:
+                if type(k) is str and DPSP in k:
+                    continue  # not addressable by dotted path
+                stack.append( (keys + (str(k),), c) )
+        ret.sort()
+        return ret
 
-    def __delitem__(self, key):
-        del self._store[self.__keytransform__(key)]
+    def _resolution_order(self, roots):
+        """
+        Returns list of paths of the strings referring to other entries
+        (given as roots and all the ones they depend on) ordered so that
+        each one follows the ones it depends on. Raises `ReferenceCycleError'
+        if the references form a cycle.
+        """
+        def _deps(refs):
+            deps = []
+            for r in sorted(refs):
+                deps += self._referring_strings(r)
+            return iter(deps)
+        order, state = [], {}
+        for root, refs in roots:
+            if root in state:
+                continue
+            state[root] = False  # in progress
+            trail = [(root, _deps(refs))]
+            while trail:
+                p, deps = trail[-1]
+                for d, dRefs in deps:
+                    if d not in state:
+                        state[d] = False
+                        trail.append( (d, _deps(dRefs)) )
+                        break
+                    if state[d] is False:
+                        chain = [t[0] for t in trail]
+                        raise ReferenceCycleError( chain[chain.index(d):] + [d] )
+                else:
+                    trail.pop()
+                    state[p] = True
+                    order.append(p)
+        return order
+
+    def resolve_references(self):
+        """
+        Interpolates all the string entries of the configuration referring
+        to the other entries (via "$(value:...)"), in dependency order: the
+        graph of references is built for the whole configuration and the
+        entries are resolved (and memoized) after the ones they refer to.
+        Raises `ReferenceCycleError' if the references form a cycle. Lazily
+        loaded sections are loaded. Returns the list of resolved paths, in
+        order.
+        """
+        order = self._resolution_order(self._referring_strings())
+        for p in order:
+            self[p]
+        return order
+
+    def resolve(self, workers=None):
+        """
+        Interpolates (and memoizes) all the entries of the configuration and
+        returns the dictionary of interpolated top-level entries. The
+        references of the I/O-bound interpolators found in the (loaded)
+        data are resolved concurrently beforehand by the pool of `workers'
+        threads (see `lamia.core.interpolation.Processor.prefetching()').
+        """
+        with self._interpolators.prefetching( self._store, marks=self._plain
+                                            , workers=workers ):
+            self.resolve_references()
+            return { k : self[k] for k in self._store }
+
+    def __setitem__(self, pth, val):
+        self._set(pth, val)
+
+    def __delitem__(self, pth):
+        self._set(pth, None, delete=True)
 
     def __iter__(self):
         return iter(self._store)
@@ -262,17 +1545,310 @@ class Configuration(collections.MutableMapping):
                 return nChanged
         raise KeyError( pth )
 
+class _FrozenDict(dict):
+    """
+    Immutable and hashable dictionary used by `FrozenConfiguration' (and as
+    read-only view of the memoized values of `Configuration'). Being a
+    dict subclass, it remains compatible with code expecting plain
+    dictionaries (JSON serialization, Jinja2 templates, etc).
+    """
+    __slots__ = ('_hash',)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Frozen configuration entries are immutable.')
+    __setitem__ = __delitem__ = clear = pop = popitem \
+                = setdefault = update = __ior__ = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return (_FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return { k : copy.deepcopy(v, memo) for k, v in self.items() }
+
+class _ReadOnlyList(list):
+    """
+    Read-only list returned for the memoized values of `Configuration'. Being
+    a list subclass, it remains compatible with code expecting plain lists;
+    copies (`copy.copy()', `copy.deepcopy()') are plain lists.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Memoized configuration entries are read-only.')
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = extend \
+                = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __reduce__(self):
+        return (_ReadOnlyList, (list(self),))
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [ copy.deepcopy(v, memo) for v in self ]
+
+def _frozen(v):
+    """
+    Returns immutable (and hashable) counterpart of the given value: dicts
+    become `_FrozenDict', lists and tuples -- tuples, sets -- frozensets.
+    Tombstones are omitted.
+    """
+    if isinstance(v, collections.Mapping):
+        return _FrozenDict( (k, _frozen(vv)) for k, vv in v.items() \
+                                            if type(vv) is not Stack._Deleted )
+    elif isinstance(v, (list, tuple)):
+        return tuple(_frozen(vv) for vv in v)
+    elif isinstance(v, (set, frozenset)):
+        return frozenset(_frozen(vv) for vv in v)
+    return v
+
+def _deep_merged(a, b):
+    """
+    Returns `b' merged over `a': the mappings are merged recursively, other
+    values of `b' override ones of `a'. Tombstones in `b' remove entries of
+    `a'. Arguments are not modified.
+    """
+    if not isinstance(a, collections.Mapping) \
+    or not isinstance(b, collections.Mapping):
+        return b
+    r = dict(a)
+    for k, v in b.items():
+        if type(v) is Stack._Deleted:
+            r.pop(k, None)
+        elif k in r:
+            r[k] = _deep_merged(r[k], v)
+        else:
+            r[k] = v
+    return r
+
+def _untombstoned(v):
+    """
+    Returns the value with nested tombstones removed. Only the dictionaries
+    containing them are copied.
+    """
+    if not isinstance(v, collections.Mapping):
+        return v
+    r = None
+    for k, e in v.items():
+        if type(e) is Stack._Deleted:
+            ne = _gMissing
+        else:
+            ne = _untombstoned(e)
+            if ne is e:
+                continue
+        if r is None:
+            r = dict(v)
+        if ne is _gMissing:
+            del r[k]
+        else:
+            r[k] = ne
+    return v if r is None else r
+
+class FrozenConfiguration(collections.Mapping):
+    """
+    Immutable, fully interpolated configuration snapshot, produced by
+    `Stack.freeze()'. Supports the dotted paths lookup, is hashable (so may
+    be used as a cache key) and may be put on `Stack' as a layer without
+    copying. Modifications have to be done within an overlay (see
+    `overlay()').
+    """
+    def __init__(self, initObject={}):
+        self._store = _frozen(initObject)
+        self._digests = _NodeDigests()
+
+    def fingerprint(self, prefix=None):
+        """
+        Returns stable content hash (hex string) of the snapshot or of its
+        subtree (see `Configuration.fingerprint()').
+        """
+        keys = () if not prefix else compiled_path(prefix).keys
+        d = _digest_at(self._digests, self._store, keys)
+        if d is None:
+            raise KeyError(prefix)
+        return '%032x'%d
+
+    def __getitem__(self, pth):
+        if DPSP in pth:
+            return compiled_path(pth).get(self._store)
+        return self._store[pth]
+
+    def __contains__(self, k):
+        if DPSP in k:
+            return compiled_path(k).has(self._store)
+        return k in self._store
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __hash__(self):
+        return hash(self._store)
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenConfiguration):
+            return self._store == other._store
+        return super().__eq__(other)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def overlay(self, c={}, tag=None):
+        """
+        Returns new `Stack' with this snapshot as a base layer and
+        (mutable) configuration `c' on top.
+        """
+        return Stack([self, (c, tag)])
+
+def _dump_binary(path, magic, obj):
+    """
+    Atomically writes the binary file of lamia's own format: signature,
+    format version byte and the pickled object.
+    """
+    fd, tmpPath = tempfile.mkstemp( dir=os.path.dirname(os.path.abspath(path))
+                                  , prefix='.lamia-' )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write( magic + bytes((gSnapshotVersion,)) )
+            pickle.dump( obj, f, protocol=pickle.HIGHEST_PROTOCOL )
+        os.replace(tmpPath, path)
+    except:
+        os.unlink(tmpPath)
+        raise
+
+def _load_binary(path, magic, what):
+    """
+    Loads the object written by `_dump_binary()' from memory-mapped file.
+    Raises RuntimeError if file has wrong signature or unsupported version.
+    """
+    hdrLen = len(magic) + 1
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise RuntimeError( 'File "%s" is empty.'%path )
+    try:
+        if mm[:len(magic)] != magic:
+            raise RuntimeError( 'File "%s" is not a %s.'%(path, what) )
+        if mm[hdrLen - 1] != gSnapshotVersion:
+            raise RuntimeError( 'Unsupported version %d of %s'
+                    ' "%s".'%(mm[hdrLen - 1], what, path) )
+        with memoryview(mm) as mv, mv[hdrLen:] as payload:
+            return pickle.loads(payload)
+    finally:
+        mm.close()
+
+def _has_signature(path, ext, magic):
+    if path.endswith(ext):
+        return True
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(magic)) == magic
+    except (OSError, TypeError, ValueError):
+        return False
+
+def is_snapshot_file(path):
+    """
+    Returns True if the given path refers to stack snapshot file (has the
+    snapshot extension or starts with the snapshot signature).
+    """
+    return _has_signature(path, gSnapshotExt, gSnapshotMagic)
+
+def is_delta_file(path):
+    """
+    Returns True if the given path refers to configuration delta file (has the
+    delta extension or starts with the delta signature).
+    """
+    return _has_signature(path, gDeltaExt, gDeltaMagic)
+
+class StackSnapshot(object):
+    """
+    Compact binary snapshot of the configuration stack layers, meant to
+    transfer the composed stack to the worker jobs without re-reading and
+    re-parsing the context files. The file consists of the signature, the
+    format version byte and the pickled list of (tag, layer) pairs; it is
+    loaded from the memory-mapped file.
+    Snapshot instance (or the snapshot file path) may be given wherever the
+    `Stack' or `Configuration' initializer is accepted: the stack gets the
+    layers with their tags, while the `Configuration' gets the layers merged.
+    Note, that snapshot is pickle-based, so only trusted files may be loaded.
+    """
+    def __init__(self, layers):
+        self.layers = layers
+
+    def dump(self, path):
+        """
+        Writes snapshot to the given file (atomically).
+        """
+        _dump_binary(path, gSnapshotMagic, self.layers)
+
+    @staticmethod
+    def load(path):
+        """
+        Loads the snapshot from file. Raises RuntimeError if file is not a
+        snapshot of supported version.
+        """
+        return StackSnapshot(_load_binary(path, gSnapshotMagic, 'configuration stack snapshot'))
+
+    def merged(self):
+        """
+        Returns the layers merged into single dictionary (upper entries
+        override the lower ones, tombstones remove them).
+        """
+        merged = {}
+        for tag, c in self.layers:
+            if isinstance(c, FrozenConfiguration):
+                c = c._store
+            merged = _deep_merged(merged, c)
+        return merged
+
+# Context-local overlay layers of the stacks: {stack key : ((tag, cfg), ...)}
+# (see `Stack.push_local()')
+gStackOverlays = contextvars.ContextVar('lamia_stack_overlays', default=None)
+gStackOverlaysLock = threading.Lock()
+
 class Stack(collections.MutableMapping):
     """
     This class orginizes Configuration instances in a stack, supporting
     entries retrieval. The latest (being on top of the stack) Configuration
     instances overrides the below ones in terms of presence.
     Caveat: to override the entry which is present in the former configuration
-    in terms of deletion, use the special Stack.Deleted object.
+    in terms of deletion, use the special Stack.Deleted object. Tombstones
+    nested within the top-level entries are omitted in the retrieved values.
+
+    The stack maintains merged index of the top-level keys: each key refers to
+    the list of layers defining it (topmost is the last), so lookup does not
+    depend on the stack depth. Index is updated by push()/pop() and by
+    item setting/deletion, so the layers must not be modified bypassing the
+    Stack interface.
+
+    Besides the shared layers, the stack may have context-local overlay
+    layers (see `push_local()') visible only within the current thread or
+    asyncio task, so the single stack may be consumed concurrently.
     """
     # static method:
     def _obj_to_cfg(self, obj):
-        if type(obj) is not Configuration:
+        if type(obj) is str and '\n' not in obj:
+            pth = urlparse(obj).path
+            if is_snapshot_file(pth):
+                return StackSnapshot.load(pth)
+            if is_delta_file(pth):
+                return ConfigurationDelta.load(pth)
+        if type(obj) is not Configuration \
+        and type(obj) is not FrozenConfiguration \
+        and type(obj) is not StackSnapshot \
+        and type(obj) is not ConfigurationDelta:
             return Configuration(obj)
         else:
             return obj
@@ -286,9 +1862,30 @@ class Stack(collections.MutableMapping):
         as an instance of configuration or its initializer object.
         It is also possible to assemble a tagget stack by passing the pairs
         (two-element tuples) within the list in form (<cfg-init-obj>, <tag>).
+        Given another `Stack' instance, the copy shares its layers (see
+        `_own_top()').
         """
         self._stack = []
-        if type(initObj) is list:
+        # top-level key -> list of (tag, cfg) layers defining it
+        self._index = {}
+        # top-level keys whose topmost definition is a tombstone
+        self._deleted = set()
+        # number of bottom layers shared with other stack(s)
+        self._nBorrowed = 0
+        # key of the context-local overlays and the number of overlays pushed
+        # within all the contexts
+        self._localKey = object()
+        self._nLocal = 0
+        if isinstance(initObj, Stack):
+            self._stack = list(initObj._stack)
+            self._index = { k : list(v) for k, v in initObj._index.items() }
+            self._deleted = set(initObj._deleted)
+            # Both stacks have to copy the shared layer prior to modification
+            self._nBorrowed = initObj._nBorrowed = len(self._stack)
+            # Overlays of the current context become the ordinary layers
+            for tag, c in initObj._local_layers():
+                self.push(c, tag=tag)
+        elif type(initObj) is list:
             for c in initObj:
                 if type(c) is tuple:
                     c, tag = c
@@ -308,31 +1905,185 @@ class Stack(collections.MutableMapping):
         """
         pass
 
+    def _reindex(self, k):
+        """
+        Updates the tombstone mark of the top-level key w.r.t. its topmost
+        definition.
+        """
+        if type(self._index[k][-1][1]._store[k]) is Stack._Deleted:
+            self._deleted.add(k)
+        else:
+            self._deleted.discard(k)
+
+    def _own_top(self):
+        """
+        Substitutes the topmost layer with its copy, if it is shared with
+        another stack, so it can be modified. The copy is cheap since the
+        data is shared until modification.
+        """
+        if len(self._stack) > self._nBorrowed:
+            return
+        top = self._stack[-1]
+        self._nBorrowed = len(self._stack) - 1
+        if type(top[1]) is not Configuration:
+            return
+        own = (top[0], Configuration(top[1]))
+        self._stack[-1] = own
+        for k in top[1]._store:
+            owners = self._index[k]
+            assert( owners[-1] is top )
+            owners[-1] = own
+
+    def _index_top(self, k):
+        """
+        Puts the top layer in the index for given top-level key.
+        """
+        top = self._stack[-1]
+        owners = self._index.setdefault(k, [])
+        if not owners or owners[-1] is not top:
+            owners.append(top)
+        self._reindex(k)
+
+    def _owners(self, pth):
+        """
+        Returns list of layers defining the top-level key of given path. For
+        glob expressions, all the layers are returned.
+        """
+        if DPSP not in pth:
+            return self._index.get(pth, [])
+        if compiled_path(pth).isGlob:
+            return self._stack
+        return self._index.get(compiled_path(pth).keys[0], [])
+
+    def _local_layers(self):
+        """
+        Returns tuple of the overlay layers pushed within current context.
+        """
+        overlays = gStackOverlays.get()
+        if not overlays:
+            return ()
+        return overlays.get(self._localKey, ())
+
+    def _layers(self):
+        """
+        Returns list of all the layers visible in current context.
+        """
+        if self._nLocal:
+            return self._stack + list(self._local_layers())
+        return self._stack
+
+    def _local_lookup(self, pth, overlays):
+        """
+        Looks for the entry in the overlay layers. Returns (True, value) if
+        found, (False, None) if the entry has to be retrieved from the shared
+        layers; raises KeyError if entry is deleted by an overlay.
+        """
+        cp = compiled_path(pth) if DPSP in pth else None
+        isGlob = cp is not None and cp.isGlob
+        for tag, e in reversed(overlays):
+            if not isGlob:
+                v = e._store.get(pth if cp is None else cp.keys[0], _gMissing)
+                if v is _gMissing:
+                    continue
+                if type(v) is Stack._Deleted:
+                    raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            try:
+                val = e[pth]
+            except KeyError:
+                continue
+            if type(val) is Stack._Deleted:
+                raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            return True, val if cp is not None else _untombstoned(val)
+        return False, None
+
     def __getitem__(self, pth):
         """
         Will pass through the configuration stack, from top to the bottom,
         trying to retrieve the requested value. Will raise KeyError exception
         if entry was explicitly deleted or does not exist at any level.
         """
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                found, val = self._local_lookup(pth, overlays)
+                if found:
+                    return val
         if not self._stack:
             raise RuntimeError( "Configuration stack is empty." )
-        for tag, e in reversed( self._stack ):
+        if gStats is not None:
+            return self._instrumented_getitem(pth)
+        if DPSP not in pth:
+            # Plain top-level key: the topmost layer defines the entry.
+            if pth in self._deleted:
+                raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            owners = self._index.get(pth, None)
+            if not owners:
+                raise KeyError( pth )
+            return _untombstoned(owners[-1][1][pth])
+        for tag, e in reversed( self._owners(pth) ):
+            if type(e._store.get(compiled_path(pth).keys[0], None)) is Stack._Deleted:
+                raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            try:
+                val = e[pth]
+            except KeyError:
+                continue
+            if type(val) is Stack._Deleted:
+                raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            return val
+        raise KeyError( pth )
+
+    def _layer_depth(self, entry):
+        for n, e in enumerate(reversed(self._stack)):
+            if e is entry:
+                return n
+
+    def _instrumented_getitem(self, pth):
+        """
+        Same as `__getitem__()', but accounts the lookup in `gStats'.
+        """
+        stats = gStats
+        stats.keys[pth] += 1
+        if DPSP not in pth:
+            owners = self._index.get(pth, None)
+            if pth in self._deleted or not owners:
+                stats.layer_lookup( None, None, False )
+                raise KeyError( pth )
+            stats.layer_lookup( self._layer_depth(owners[-1]), owners[-1][0], True )
+            return _untombstoned(owners[-1][1][pth])
+        for entry in reversed( self._owners(pth) ):
+            tag, e = entry
+            depth = self._layer_depth(entry)
+            if type(e._store.get(compiled_path(pth).keys[0], None)) is Stack._Deleted:
+                stats.layer_lookup( depth, tag, False )
+                raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
             try:
                 val = e[pth]
             except KeyError:
+                stats.layer_lookup( depth, tag, False )
                 continue
             if type(val) is Stack._Deleted:
+                stats.layer_lookup( depth, tag, False )
                 raise KeyError( 'The "%s" entry was explicitly deleted.'%pth )
+            stats.layer_lookup( depth, tag, True )
             return val
+        stats.layer_lookup( None, None, False )
         raise KeyError( pth )
 
     def __setitem__(self, path, val):
         """
-        Sets the entry within top Configuration instance on the stack.
+        Sets the entry within top Configuration instance on the stack (or
+        within the topmost context-local overlay, if any).
         """
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                overlays[-1][1][path] = val
+                return
         if not self._stack:
-            self._stack = [ ( None, Configuration({})) ]
+            self.push( {} )
+        self._own_top()
         self._stack[-1][1][path] = val
+        self._index_top( compiled_path(path).keys[0] if DPSP in path else path )
 
     def __delitem__(self, path):
         """
@@ -340,46 +2091,108 @@ class Stack(collections.MutableMapping):
         _Deleted instance as a tombstone. If no such entry found, it will be
         marked as a deleted anyway.
         """
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                overlays[-1][1][path] = Stack._Deleted()
+                return
+        self._own_top()
         self._stack[-1][1][path] = Stack._Deleted()
+        self._index_top( compiled_path(path).keys[0] if DPSP in path else path )
+
+    def _local_contains(self, k, overlays):
+        """
+        Returns True/False if the entry is defined/deleted by the overlay
+        layers, or None if they do not define it.
+        """
+        cp = compiled_path(k) if DPSP in k else None
+        for tag, e in reversed(overlays):
+            if cp is not None and cp.isGlob:
+                if k in e:
+                    return True
+                continue
+            v = e._store.get(k if cp is None else cp.keys[0], _gMissing)
+            if v is _gMissing:
+                continue
+            if type(v) is Stack._Deleted:
+                return False
+            if cp is None:
+                return True
+            try:
+                val = cp.get(e._store)
+            except KeyError:
+                continue
+            return not isinstance(val, Stack._Deleted)
+        return None
+
+    def _local_keys(self, overlays):
+        keys = dict.fromkeys( k for k in self._index if k not in self._deleted )
+        for tag, e in overlays:
+            for k, v in e._store.items():
+                if type(v) is Stack._Deleted:
+                    keys.pop(k, None)
+                else:
+                    keys[k] = None
+        return keys
 
     def __contains__(self, k):
-        for tag, c in reversed( self._stack ):
-            if k in c.keys():
-                try:
-                    val = c[k]
-                except( lamia.core.interpolation.InterpolationTypeError ) as e:
-                    if e.type_ is Stack._Deleted:
-                        return False
-                return not isinstance(val, Stack._Deleted)
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                r = self._local_contains(k, overlays)
+                if r is not None:
+                    return r
+        if DPSP not in k:
+            return k in self._index and k not in self._deleted
+        for tag, c in reversed( self._owners(k) ):
+            if type(c._store.get(compiled_path(k).keys[0], None)) is Stack._Deleted:
+                return False
+            try:
+                val = compiled_path(k).get(c._store)
+            except KeyError:
+                continue
+            return not isinstance(val, Stack._Deleted)
         return False
 
     def __iter__(self):
-        keysPassed = set({})
-        for tag, c in reversed(self._stack):
-            for k, v in c.items():
-                if k not in keysPassed:
-                    keysPassed.add(k)
-                else:
-                    continue
-                if not isinstance(v, Stack._Deleted) :
-                    yield k
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                return iter(list(self._local_keys(overlays)))
+        return ( k for k in self._index if k not in self._deleted )
 
     def __len__(self):
-        uniqKeys = {}  # (key, exists)
-        for tag, c in reversed(self._stack):
-            for k, v in c.items():
-                if k not in uniqKeys.keys():
-                    uniqKeys[k] = isinstance( v, Stack._Deleted )
-        return reduce( lambda c, v: int(c) if v else int(c) + 1, uniqKeys.values(), 0 )
+        if self._nLocal:
+            overlays = self._local_layers()
+            if overlays:
+                return len(self._local_keys(overlays))
+        return len(self._index) - len(self._deleted)
 
     def push( self, c, tag=None ):
         """
         Only dict/Configuration instances are allowed. Otherwise, type error
-        will be raised.
+        will be raised. The layers of `StackSnapshot' are pushed with their
+        own tags (so the tag must not be given). The `ConfigurationDelta' is
+        pushed as a layer applying it to the current stack (see
+        `push_delta()').
         """
-        # Copy original, even if it is already a configuration
-        c = Configuration( c )
+        if type(c) is ConfigurationDelta:
+            return self.push_delta(c, tag=tag)
+        if type(c) is StackSnapshot:
+            if tag is not None:
+                raise StackTagError( 'Stack snapshot layers are pushed with'
+                        ' their own tags; got: %s.'%tag )
+            for lTag, lc in c.layers:
+                self.push(lc, tag=lTag)
+            return
+        # Copy original, even if it is already a configuration (copy is cheap
+        # since the data is shared until modification). Frozen snapshots are
+        # put as is.
+        if type(c) is not FrozenConfiguration:
+            c = Configuration( c )
         self._stack.append( (tag, c) )
+        for k in c._store:
+            self._index_top(k)
 
     def pop( self, tag=None ):
         if (tag is not None \
@@ -388,7 +2201,172 @@ class Stack(collections.MutableMapping):
             and self._stack[-1][0] is not None):
             raise StackTagError( 'Configuration stack tag mismatch;'
                 ' has: %s, tried: %s.'%( self._stack[-1][0], tag) )
-        self._stack.pop()
+        top = self._stack.pop()
+        self._nBorrowed = min(self._nBorrowed, len(self._stack))
+        for k in top[1]._store:
+            owners = self._index[k]
+            assert( owners[-1] is top )
+            owners.pop()
+            if owners:
+                self._reindex(k)
+            else:
+                del self._index[k]
+                self._deleted.discard(k)
+
+    def push_local( self, c, tag=None ):
+        """
+        Pushes the overlay layer visible only within the current context
+        (thread or asyncio task; tasks started from the context inherit its
+        overlays). The overlays are put atop of the shared layers: the
+        entries are first looked up within them, and the item assignment or
+        deletion affects the topmost overlay. The shared layers are not
+        modified, so the concurrent workers may each render with its own
+        overlays over the common stack. Copy of the stack (`Stack(stk)')
+        takes the overlays of the current context as ordinary layers.
+        """
+        if type(c) is not FrozenConfiguration:
+            c = Configuration( c )
+        overlays = dict(gStackOverlays.get() or {})
+        overlays[self._localKey] = overlays.get(self._localKey, ()) + ((tag, c),)
+        gStackOverlays.set(overlays)
+        with gStackOverlaysLock:
+            self._nLocal += 1
+
+    def pop_local( self, tag=None ):
+        """
+        Removes the topmost overlay layer of the current context. Tags are
+        checked as for `pop()'.
+        """
+        local = self._local_layers()
+        if not local:
+            raise StackTagError( 'No context-local layers on the stack;'
+                    ' tried: %s.'%tag )
+        if local[-1][0] != tag:
+            raise StackTagError( 'Configuration stack tag mismatch;'
+                ' has: %s, tried: %s.'%( local[-1][0], tag) )
+        overlays = dict(gStackOverlays.get())
+        if len(local) > 1:
+            overlays[self._localKey] = local[:-1]
+        else:
+            del overlays[self._localKey]
+        gStackOverlays.set(overlays)
+        with gStackOverlaysLock:
+            self._nLocal -= 1
+
+    def freeze(self):
+        """
+        Returns immutable, fully interpolated `FrozenConfiguration' snapshot
+        of the stack. Unlike the lookup of top-level entries on the stack, the
+        snapshot merges nested dictionaries of the layers (upper entries
+        override the lower ones, tombstones remove them).
+        """
+        merged = {}
+        for tag, c in self._layers():
+            for k in c:
+                v = c[k]
+                if type(v) is Stack._Deleted:
+                    merged.pop(k, None)
+                elif k in merged:
+                    merged[k] = _deep_merged(merged[k], v)
+                else:
+                    merged[k] = v
+        return FrozenConfiguration(merged)
+
+    def view(self):
+        """
+        Returns read-only `StackView' mapping over the stack.
+        """
+        return StackView(self)
+
+    def _merged_value(self, k):
+        """
+        Returns the top-level entry with nested dictionaries of the layers
+        merged (as `freeze()' does) and tombstones removed, or `_gMissing' if
+        entry is not defined. Values are interpolated within their layers.
+        """
+        v = _gMissing
+        for tag, c in self._index.get(k, ()):
+            if type(c._store[k]) is Stack._Deleted:
+                v = _gMissing
+            elif v is _gMissing:
+                v = c[k]
+            else:
+                v = _deep_merged(v, c[k])
+        return _untombstoned(v)
+
+    def push_delta(self, delta, tag=None):
+        """
+        Pushes the layer making the stack to match the delta's target (see
+        `compute_delta()'). The layer defines the changed top-level entries
+        fully: the values merged over the layers below (interpolated within
+        their layers, see `_merged_value()') with the delta applied, so the
+        lookup of the top-level entry retrieves the whole target value.
+        Removed entries are marked by tombstones (hiding the ones of the
+        layers below from the dotted lookup and `freeze()'); other top-level
+        entries are still retrieved (and interpolated) from the layers below.
+        """
+        data = {}
+        for keys in itertools.chain(delta.deleted, delta.set.keys()):
+            if len(keys) > 1 and keys[0] not in data:
+                v = self._merged_value(keys[0])
+                if v is not _gMissing:
+                    data[keys[0]] = v
+        cfg = Configuration(data)
+        for keys in delta.deleted:
+            cfg._set_keys(keys, Stack._Deleted())
+        for keys, v in delta.set.items():
+            cfg._set_keys(keys, v)
+        self.push(cfg, tag=tag)
+
+    def fingerprint(self, prefix=None):
+        """
+        Returns stable content hash (hex string) of the stack or of the
+        subtree at given dotted path, combining (in order) the tags and the
+        content digests of the layers defining it (see
+        `Configuration.fingerprint()'). Since layer digests are cached, the
+        combination takes time proportional to the stack depth.
+        """
+        keys = () if not prefix else compiled_path(prefix).keys
+        if not keys:
+            layers = self._layers()
+        else:
+            layers = self._index.get(keys[0], []) + [ l for l in self._local_layers() \
+                                                        if keys[0] in l[1]._store ]
+        hh = hashlib.blake2b(b'stack', digest_size=16)
+        for tag, c in layers:
+            d = _digest_at(c._digests, c._store, keys)
+            if d is None:
+                continue
+            hh.update( repr(tag).encode() )
+            hh.update( _b(d) )
+        return hh.hexdigest()
+
+    def snapshot(self, interpolate=False):
+        """
+        Returns `StackSnapshot' of the current stack layers. The lazily-loaded
+        sections are resolved. With `interpolate', the entries are stored
+        interpolated; by default they are kept as is, since interpolated
+        values may depend on the execution environment (e.g. "$(ENV:...)").
+        """
+        layers = []
+        for tag, c in self._layers():
+            if type(c) is FrozenConfiguration:
+                layers.append( (tag, c) )
+                continue
+            if interpolate:
+                store = { k : c[k] for k in c._store }
+            else:
+                store = { k : (v.value if type(v) is LazySection else v) \
+                                            for k, v in c._store.items() }
+            layers.append( (tag, store) )
+        return StackSnapshot(layers)
+
+    def dump_snapshot(self, path, interpolate=False):
+        """
+        Writes the binary snapshot of the stack to the given file (see
+        `snapshot()', `StackSnapshot').
+        """
+        self.snapshot(interpolate=interpolate).dump(path)
 
     def argparse_override(self, overrideExpr):
         """
@@ -438,55 +2416,346 @@ class Stack(collections.MutableMapping):
     def apply(self, callee, argsListName=None ):
         """
         Invokes given function with values taken from this config stack,
-        matching to signature.
+        matching to signature. Only the entries consumed by callee are
+        retrieved (and interpolated), unless it accepts `**kwargs', in which
+        case the whole stack is materialized. See `_apply_plan()'.
         """
         L = logging.getLogger(__name__)
-        s = inspect.signature(callee)
+        params, hasVarKw = _apply_plan(callee)
         args=[]
         kwargs={}
-        ctx = copy.copy(dict(self))
-        for pn, p in s.parameters.items():
-            if inspect.Parameter.POSITIONAL_ONLY == p.kind:
-                raise NotImplementedError("Positional only args aren't supported.")
-                #if pn in ctx:  # TODO no name for positional only?
-                #    args.append( ctx.pop(pn) )
-                #elif p.default != inspect.Parameter.empty:
-                #    args.append( p.default )
-                #else:
-                #    raise TypeError('No value for "%s" in call of %s.'%(
-                #        pn, str(f)))
-            elif inspect.Parameter.POSITIONAL_OR_KEYWORD == p.kind:
-                if pn in ctx:
-                    args.append( ctx.pop(pn) )
-                elif p.default != inspect.Parameter.empty:
-                    args.append( p.default )
+        if hasVarKw:
+            ctx = dict(self)
+            has, take = ctx.__contains__, ctx.pop
+        else:
+            ctx = None
+            has, take = self.__contains__, self.__getitem__
+        for pn, kind, default in params:
+            if inspect.Parameter.POSITIONAL_OR_KEYWORD == kind:
+                if has(pn):
+                    args.append( take(pn) )
+                elif default is not inspect.Parameter.empty:
+                    args.append( default )
                 else:
                     raise TypeError('No value for "%s" in call of %s.'%(
                         pn, str(callee)))
-            elif inspect.Parameter.VAR_POSITIONAL == p.kind:
-                args += ctx.pop(argsListName) if argsListName in ctx else [[]]
-            elif inspect.Parameter.KEYWORD_ONLY == p.kind:
-                if pn in ctx:
-                    kwargs[pn] = ctx.pop(pn)
-                elif p.default != inspect.Parameter.empty:
-                    kwargs[pn] = p.default
+            elif inspect.Parameter.VAR_POSITIONAL == kind:
+                args += take(argsListName) if argsListName is not None \
+                                          and has(argsListName) else [[]]
+            elif inspect.Parameter.KEYWORD_ONLY == kind:
+                if has(pn):
+                    kwargs[pn] = take(pn)
+                elif default is not inspect.Parameter.empty:
+                    kwargs[pn] = default
                 else:
                     raise TypeError('No value given and no default value is'
                             ' defined for "%s" in call of %s.'%(
                                 pn, str(callee)))
-            elif inspect.Parameter.VAR_KEYWORD == p.kind:
+            elif inspect.Parameter.VAR_KEYWORD == kind:
                 kwargs.update(ctx)
         L.debug('Applying conf stack: %s, %s'%(str(args), str(kwargs)))
         return callee(*args, **kwargs)
 
-def compose_stack( ctx=[], defs=[] ):
+class StackView(collections.Mapping):
+    """
+    Read-only mapping proxy over the `Stack', meant for the consumers
+    expecting plain mapping (e.g. template rendering context). Unlike the
+    `dict(stack)', the view does not materialize the stack: the entries are
+    retrieved (and interpolated) on the first access and kept by the view
+    for subsequent ones.
+    """
+    def __init__(self, stack):
+        self._stack = stack
+        self._resolved = {}
+
+    def __getitem__(self, k):
+        try:
+            return self._resolved[k]
+        except KeyError:
+            pass
+        v = self._resolved[k] = self._stack[k]
+        return v
+
+    def __contains__(self, k):
+        return k in self._resolved or k in self._stack
+
+    def __iter__(self):
+        return iter(self._stack)
+
+    def __len__(self):
+        return len(self._stack)
+
+    def __repr__(self):
+        return '<StackView of %d entries, %d resolved>'%(len(self), len(self._resolved))
+
+# function -> {isBound : plan}, see `_apply_plan()'
+gApplyPlans = weakref.WeakKeyDictionary()
+
+def _apply_plan(callee):
+    """
+    Returns the argument plan of the callee for `Stack.apply()': the tuple of
+    (name, kind, default) triplets of its parameters and the flag indicating
+    whether `**kwargs' are accepted. Plans are cached per function (for bound
+    methods -- per underlying function), so the signature is inspected once.
+    """
+    fn = getattr(callee, '__func__', callee)
+    isBound = fn is not callee
+    try:
+        plans = gApplyPlans.get(fn, None)
+    except TypeError:
+        plans = None  # not weak-referenceable callable; won't be cached
+    else:
+        if plans is not None and isBound in plans:
+            return plans[isBound]
+    params = []
+    hasVarKw = False
+    for pn, p in inspect.signature(callee).parameters.items():
+        if inspect.Parameter.POSITIONAL_ONLY == p.kind:
+            raise NotImplementedError("Positional only args aren't supported.")
+        if inspect.Parameter.VAR_KEYWORD == p.kind:
+            hasVarKw = True
+        params.append( (pn, p.kind, p.default) )
+    plan = (tuple(params), hasVarKw)
+    try:
+        gApplyPlans.setdefault(fn, {})[isBound] = plan
+    except TypeError:
+        pass
+    return plan
+
+class SchemaValidationError(RuntimeError):
+    pass
+
+class SectionAccessor(object):
+    """
+    Base class for the generated accessors of configuration sections (see
+    `section_accessor()'). Instance keeps the values retrieved (and
+    interpolated) once from the configuration as slotted attributes, so the
+    frequent reads do not involve the path lookups and interpolation. Note,
+    that the collection values are the read-only views returned by the
+    configuration (see `Configuration'), shared by all the users of the
+    accessor instance, so the caller has to copy them (`copy.deepcopy()'
+    gives plain dicts and lists) prior to modification.
+    """
+    __slots__ = ()
+    # tuple of (attribute, path, type, default) entries
+    _schema = ()
+    # marks the entries having no default value
+    Required = inspect.Parameter.empty
+
+    @classmethod
+    def from_config(cls, cfg):
+        """
+        Retrieves the values declared by schema from given configuration
+        (Stack, Configuration or any mapping supporting the dotted paths).
+        Raises `SchemaValidationError' if required entry is absent or the
+        value is of unexpected type.
+        """
+        self = cls.__new__(cls)
+        for attr, pth, t, default in cls._schema:
+            try:
+                v = cfg[pth]
+            except KeyError:
+                if default is SectionAccessor.Required:
+                    raise SchemaValidationError( '%s: required configuration'
+                            ' entry "%s" is not defined.'%(cls.__name__, pth) )
+                v = copy.deepcopy(default)
+            if t is not None and not isinstance(v, t):
+                raise SchemaValidationError( '%s: configuration entry "%s" is'
+                        ' of type %s, while %s is expected.'%( cls.__name__
+                            , pth, type(v).__name__
+                            , t.__name__ if type(t) is type else t ) )
+            setattr(self, attr, v)
+        return self
+
+    def as_dict(self):
+        return { a : getattr(self, a) for a in self.__slots__ }
+
+    def __repr__(self):
+        return '<%s %s>'%(type(self).__name__, str(self.as_dict()))
+
+def section_accessor(name, schema):
+    """
+    Generates `SectionAccessor' subclass of given name for the configuration
+    section described by the schema. Schema is a dictionary of form:
+        { <attribute> : (<dotted-path>, <type>[, <default>]) }
+    where type may be a type, tuple of types or None (not checked). Entries
+    without default are required.
+    """
+    entries = []
+    for attr, decl in schema.items():
+        if len(decl) == 2:
+            decl = tuple(decl) + (SectionAccessor.Required,)
+        pth, t, default = decl
+        entries.append( (attr, pth, t, default) )
+    return type( name, (SectionAccessor,)
+               , { '__slots__' : tuple(schema.keys())
+                 , '_schema' : tuple(entries) } )
+
+class ConfigurationDelta(object):
+    """
+    Difference between two configurations, as computed by `compute_delta()':
+    the `set' dictionary of new/changed values indexed by key tuples and the
+    `deleted' list of key tuples of the removed entries. Values are kept
+    uninterpolated. May be written in compact binary form and loaded (or
+    pushed to the `Stack' by path) with the extension or signature of delta
+    file.
+    """
+    def __init__(self, set_=None, deleted=None):
+        self.set = set_ if set_ is not None else {}
+        self.deleted = deleted if deleted is not None else []
+
+    def __bool__(self):
+        return bool(self.set or self.deleted)
+
+    def __eq__(self, other):
+        return isinstance(other, ConfigurationDelta) \
+           and self.set == other.set \
+           and sorted(map(repr, self.deleted)) == sorted(map(repr, other.deleted))
+
+    def __repr__(self):
+        return '<ConfigurationDelta set=%s deleted=%s>'%(str(self.set), str(self.deleted))
+
+    def dump(self, path):
+        """
+        Writes delta to the given file (atomically).
+        """
+        _dump_binary(path, gDeltaMagic, (self.set, self.deleted))
+
+    @staticmethod
+    def load(path):
+        """
+        Loads the delta from file. Raises RuntimeError if file is not a delta
+        of supported version.
+        """
+        return ConfigurationDelta(*_load_binary(path, gDeltaMagic, 'configuration delta'))
+
+def _raw_data(obj):
+    """
+    Returns the uninterpolated data of configuration object (for `Stack' --
+    the layers merged).
+    """
+    if isinstance(obj, Stack):
+        return obj.snapshot().merged()
+    if isinstance(obj, (Configuration, FrozenConfiguration)):
+        return obj._store
+    if isinstance(obj, StackSnapshot):
+        return obj.merged()
+    if type(obj) is dict:
+        return obj
+    return Configuration(obj)._store
+
+def _diff(a, b, prefix, delta):
+    for k, vb in b.items():
+        if k not in a:
+            delta.set[prefix + (k,)] = vb
+            continue
+        va = a[k]
+        if va is vb:
+            continue
+        if type(va) is LazySection:
+            va = va.value
+        if type(vb) is LazySection:
+            vb = vb.value
+        if isinstance(va, collections.Mapping) \
+        and isinstance(vb, collections.Mapping):
+            _diff(va, vb, prefix + (k,), delta)
+        elif va != vb or type(va) is not type(vb):
+            delta.set[prefix + (k,)] = vb
+    for k in a.keys():
+        if k not in b:
+            delta.deleted.append(prefix + (k,))
+
+def compute_delta(base, target):
+    """
+    Computes minimal `ConfigurationDelta' turning `base' into `target'. Both
+    may be given as `Stack', `Configuration', snapshot or any initializer of
+    `Configuration'. Stacks are compared by their merged data (as it is done by
+    `Stack.freeze()'). Nested dictionaries are compared recursively, while
+    other values (including lists) are compared as a whole. Subtrees shared by
+    both configurations (e.g. copied-on-write ones) are skipped without
+    comparison.
+    """
+    delta = ConfigurationDelta()
+    _diff(_raw_data(base), _raw_data(target), (), delta)
+    return delta
+
+def apply_delta(base, delta, tag=None):
+    """
+    Applies the `ConfigurationDelta' to given base, that remains intact. For
+    the `Stack', returns new stack sharing the layers of base, with pushed
+    layer of given tag (see `Stack.push_delta()'). Otherwise returns new
+    `Configuration' instance sharing the data with base (copy-on-write).
+    """
+    if isinstance(base, Stack):
+        stk = Stack([ (c, t) for t, c in base._stack ])
+        stk.push_delta(delta, tag=tag)
+        return stk
+    cfg = Configuration(base)
+    for keys in delta.deleted:
+        try:
+            cfg._set_keys(keys, None, delete=True)
+        except KeyError:
+            pass
+    for keys, v in delta.set.items():
+        cfg._set_keys(keys, v)
+    return cfg
+
+def _load_context_source(src):
+    """
+    Loads the context file given by path or `file://' URI into the object
+    that `Stack' accepts as a layer initializer (dict, snapshot or delta).
+    """
+    pst = urlparse(src)
+    if '' != pst.scheme and 'file' != pst.scheme:
+        raise NotImplementedError( "URI Scheme \"%s\" is not yet supported."%pst.scheme )
+    if is_delta_file(pst.path):
+        return ConfigurationDelta.load(pst.path)
+    return parse_context_stream(pst.path)
+
+def _load_context_sources(ctx, workers=None, processes=None):
+    """
+    Returns the list of context entries with the file paths substituted by
+    the loaded content. Files are read and parsed concurrently, by pool of
+    threads or (if `processes' is set) processes; stdin ("-") and in-memory
+    objects are left as is, to be loaded sequentially by `Stack'. Order of
+    the entries is preserved.
+    """
+    env = os.environ
+    if workers is None:
+        workers = int(env.get(gLoadWorkersEnvVar, gLoadWorkersDefault))
+    if processes is None:
+        processes = env.get(gLoadProcessesEnvVar, '').lower() in ('1', 'yes', 'true', 'on')
+    def _src(e):
+        c = e[0] if type(e) is tuple else e
+        if type(c) is str and '\n' not in c and '-' != c:
+            return c
+    srcs = [ (n, _src(e)) for n, e in enumerate(ctx) if _src(e) is not None ]
+    if workers < 2 or len(srcs) < 2:
+        return ctx
+    Executor = concurrent.futures.ProcessPoolExecutor if processes \
+          else concurrent.futures.ThreadPoolExecutor
+    ctx = list(ctx)
+    with Executor(max_workers=min(workers, len(srcs))) as pool:
+        for (n, src), obj in zip( srcs
+                                , pool.map(_load_context_source, [s for _, s in srcs]) ):
+            ctx[n] = (obj, ctx[n][1]) if type(ctx[n]) is tuple else obj
+    return ctx
+
+def compose_stack( ctx=[], defs=[], workers=None, processes=None ):
     """
     A common pattern of applying the configuration stack is to specify the list
     of config files and user overriding definitions within the command line.
     This function helps to apply them.
+    Context files are loaded concurrently by the pool of `workers' threads (or
+    processes, if `processes' is set; this may be beneficial for parse-heavy
+    files), the defaults are defined by the environment variables
+    `gLoadWorkersEnvVar', `gLoadProcessesEnvVar'. The layers are pushed in the
+    order of the given contexts.
     """
     if not ctx: ctx = []
     if not defs: defs = []
+    if type(ctx) is list:
+        ctx = _load_context_sources(ctx, workers=workers, processes=processes)
     stk = Stack( ctx )
     for d in defs:
         stk.argparse_override(d)
@@ -523,3 +2792,7 @@ class StackConfs(object):
         for n, c in reversed(list(enumerate(self._entries))):
             self._stk.pop( tag='%s-%s'%(str(id(self)), str(n)) )
 
+if os.environ.get(gStatsEnvVar, ''):
+    import atexit
+    enable_stats()
+    atexit.register( _dump_stats_at_exit, os.environ[gStatsEnvVar] )
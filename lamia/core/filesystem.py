@@ -21,9 +21,10 @@
 """
 Various auxilliary filesystem routines, coming in hand for lamia procedures.
 """
-import os, sys, errno, collections, re, dpath, yaml, itertools, logging, copy \
+import os, sys, errno, collections, re, dpath, yaml, logging, copy \
      , glob, contextlib, argparse, io, bidict, json
-import lamia.core.interpolation, lamia.core.configuration, lamia.confirm
+import lamia.core.interpolation, lamia.core.configuration, lamia.core.tables \
+     , lamia.confirm
 from enum import Enum
 from string import Formatter
 
@@ -67,64 +68,189 @@ class DulicatingAlias(KeyError):
 def _is_seq(v):
     if isinstance( v, tuple ) \
     or isinstance( v, list ) \
-    or isinstance( v, set ):
+    or isinstance( v, (set, frozenset) ) \
+    or isinstance( v, lamia.core.tables.Column ):
         return True
     return False
 
-def dict_product(**kwargs):
+gScalarTypes = (bool, int, float, str)
+
+def _sorted_out(kwargs):
     """
-    Returns an iterator to the dictionaries set obtained from given one by
-    splitting out (product) of element's components. E.g. the
-    kwargs={one:[1, 2], two:[3,4]} will yield:
-        {one:1, two:3}
-        {one:1, two:4}
-        {one:2, two:3}
-        {one:2, two:4}
-    Order is not guaranteed.
-    TODO: support for nested dicts/sequences.
+    Sorts out the scalar values, product dimensions and callables of the
+    product. Dimensions are given as list of (key, values) pairs, where key
+    is a list of keys for the zipped table columns.
     """
-    L = logging.getLogger(__name__)
-    scalars = {}
-    sequences = {}
-    callables = {}
-    # Iterate over keyword arguments to sort out the scalar values, sequences
-    # and callable objects (that may, in order, yield either a scalar or
-    # sequence).
+    scalars, dims, callables = {}, [], {}
+    zipped = {}
     for k, v in kwargs.items():
-        if _is_seq(v):
-            sequences[k] = v
-            if any( map( lambda x: type(x) not in (bool, int, float, str)
-                       , v )
-                  ):
-                raise NotImplementedError("Nested sequences aren't"
-                        " yet supported.")  # TODO
-        elif type(v) in (bool, int, float, str):
+        if isinstance(v, lamia.core.tables.Column) and v.table is not None:
+            # Columns of the same table make a single dimension of zipped
+            # values
+            if id(v.table) in zipped:
+                zipped[id(v.table)][0].append(k)
+                zipped[id(v.table)][1].append(v)
+                continue
+            zipped[id(v.table)] = ([k], [v])
+            dims.append(zipped[id(v.table)])
+        elif _is_seq(v) or isinstance(v, collections.Mapping):
+            dims.append( (k, v) )
+        elif type(v) in gScalarTypes:
             scalars[k] = v
         elif callable(v):
             callables[k] = v
         else:
             raise TypeError('%s: %s'%(k, type(v).__name__))
-    keys = sequences.keys()
-    vals = sequences.values()
-    # Obtain cartesian products of all the sequences, evolving them into scalar
-    # values. With each comination of scalar values derived from the product,
-    # compose the "plain" dictionary and use it with callables to yield the
-    # callables results.
-    for instance in itertools.product(*vals):
-        assert(len(keys) == len(instance))  # cohesiveness of product and keys
-        dct = dict(zip(keys, instance))
-        dct.update(scalars)  # update product result with scalars
-        if not callables:
-            yield dct  # No callables -> just yield the plain dict
+    return scalars, dims, callables
+
+def _n_values(v):
+    """
+    Returns number of values the product dimension takes for given value
+    (None if it can not be known without evaluating callables).
+    """
+    if isinstance(v, collections.Mapping):
+        return DictProduct(v).product_size()
+    if isinstance(v, lamia.core.tables.Column) or not _is_seq(v):
+        return 1 if not _is_seq(v) else len(v)
+    n = 0
+    for e in v:
+        if type(e) in gScalarTypes:
+            n += 1
+            continue
+        m = _n_values(e)
+        if m is None:
+            return None
+        n += m
+    return n
+
+def _values(v):
+    """
+    Returns sequence of values the product dimension takes: sequences of
+    scalars are used as is, nested sequences are flattened, nested dicts
+    are expanded into their products.
+    """
+    if isinstance(v, collections.Mapping):
+        return list(DictProduct(v))
+    if isinstance(v, (set, frozenset)):
+        v = list(v)
+    if isinstance(v, lamia.core.tables.Column) \
+    or all( type(e) in gScalarTypes for e in v ):
+        return v
+    ret = []
+    for e in v:
+        if type(e) in gScalarTypes:
+            ret.append(e)
+        elif isinstance(e, collections.Mapping) or _is_seq(e):
+            ret.extend(_values(e))
+        else:
+            raise TypeError('Unexpected element in sequence: %s'%type(e).__name__)
+    return ret
+
+class DictProduct(object):
+    """
+    Iterable set of dictionaries obtained from given one by splitting out
+    (product) of element's components. E.g. the {one:[1, 2], two:[3,4]} will
+    yield:
+        {one:1, two:3}
+        {one:1, two:4}
+        {one:2, two:3}
+        {one:2, two:4}
+    The columns of the same table (see `lamia.core.tables') are zipped rather
+    than multiplied: they yield the table rows. Nested sequences are
+    flattened; nested dicts are expanded into their own products, so the
+    entry takes each of the nested dicts as a value. Callables are invoked
+    with each combination and their results are multiplied in turn.
+
+    Combinations are generated iteratively (as an odometer over the
+    dimensions, the last one changing fastest), updating only the changed
+    entries of the state shared between consecutive combinations. By
+    default a copy of the state is yielded; with `shared' set, the same
+    dictionary is yielded each time (and must not be kept or modified by
+    the caller). Note, that the expanded nested dicts are shared between
+    the combinations anyway.
+    """
+    def __init__(self, kwargs, shared=False, _base=None):
+        self.scalars, self.dims, self.callables = _sorted_out(kwargs)
+        self.shared = shared
+        self._base = _base
+
+    def product_size(self):
+        """
+        Returns number of combinations without enumerating them, or None if
+        it depends on the callables results.
+        """
+        if self.callables:
+            return None
+        size = 1
+        for k, v in self.dims:
+            if type(k) is list:
+                n = len(v[0])
+            else:
+                n = _n_values(v)
+                if n is None:
+                    return None
+            size *= n
+        return size
+
+    def __len__(self):
+        size = self.product_size()
+        if size is None:
+            raise TypeError( 'Size of product with callables is not known'
+                    ' prior to enumeration.' )
+        return size
+
+    def _set(self, state, n, i, values):
+        k = self.dims[n][0]
+        if type(k) is list:
+            for kk, c in zip(k, values[n]):
+                state[kk] = c[i]
         else:
-            # Fill the callable results
-            callableAppendix = {}
-            for ck, c in callables.items():
-                callableAppendix[ck] = c(dct)
-            # Update the plain dict with callable result and recursively
-            # compute product on them
-            dct.update(callableAppendix)
-            yield from dict_product(**dct)
+            state[k] = values[n][i]
+
+    def __iter__(self):
+        state = dict(self._base) if self._base else {}
+        state.update(self.scalars)
+        values = [ v if type(k) is list else _values(v) for k, v in self.dims ]
+        lens = [ len(v[0]) if type(k) is list else len(v) \
+                                for (k, _), v in zip(self.dims, values) ]
+        if not all(lens):
+            return
+        n = len(lens)
+        idx = [0]*n
+        for m in range(n):
+            self._set(state, m, 0, values)
+        while True:
+            if self.callables:
+                # Fill the callable results and compute product on them
+                appendix = {}
+                for ck, c in self.callables.items():
+                    appendix[ck] = c(dict(state))
+                yield from DictProduct(appendix, shared=self.shared, _base=state)
+            elif self.shared:
+                yield state
+            else:
+                yield dict(state)
+            # Advance the odometer
+            m = n - 1
+            while m >= 0:
+                idx[m] += 1
+                if idx[m] < lens[m]:
+                    self._set(state, m, idx[m], values)
+                    break
+                idx[m] = 0
+                self._set(state, m, 0, values)
+                m -= 1
+            if m < 0:
+                return
+
+def dict_product(**kwargs):
+    """
+    Returns an iterable of the dictionaries set obtained from given one by
+    splitting out (product) of element's components (see `DictProduct').
+    Combinations follow the `itertools.product()' order, the last dimension
+    changing fastest.
+    """
+    return DictProduct(kwargs)
 
 # This strightforward inplementation seems legit, but needs more checks
 # against Python's conventions within complex keys indexing.
@@ -145,12 +271,11 @@ def _rv_value(d, k, requireComplete=True):
     etc.
     """
     key = py_index_to_pdict(k)
-    r = dpath.util.search( d, key, separator='.' )
-    if r:
-        return dpath.get(d, key, separator='.')
-    elif not requireComplete:
-        return '{%s}'%k  # NOTE: was `return k', check side effects
-    else:
+    try:
+        return lamia.core.configuration.compiled_path(key).get(d)
+    except KeyError:
+        if not requireComplete:
+            return '{%s}'%k  # NOTE: was `return k', check side effects
         raise KeyError(k)
 
 # TODO: rename to 'render_path_template' (without 's') since the *args are
@@ -316,7 +441,9 @@ class FileHandlerContextManager(object):
         self._alias = alias
 
     def __enter__(self):
-        self.gCtxRef.push(
+        # The path variables are pushed as context-local overlay, so the
+        # shared context stack is not modified while rendering
+        self.gCtxRef.push_local(
                 { 'LAMIA' : {
                     'path' : self._path,  # (former ?)
                     'pathContext' : self.lCtxRef,  # (former __p)
@@ -391,7 +518,7 @@ class FileHandlerContextManager(object):
 
     def __exit__(self, excType, excValue, traceBack):
         L = logging.getLogger(__name__)
-        self.gCtxRef.pop( tag='runtime-path-vars' )
+        self.gCtxRef.pop_local( tag='runtime-path-vars' )
         if excType is None:
             cl = len(self._file.getvalue())
             L.debug( 'Rendered content for "{path}" of size {size}.'.format(
@@ -617,7 +744,7 @@ class Paths( collections.MutableMapping ):
         ret = {}
         if dirStruct is None or not dirStruct:
             return None
-        if type(dirStruct) is not dict:
+        if not isinstance(dirStruct, dict):
             raise TypeError( 'At %s: dict expected, got %s.'%('.'.join(path)
                            , type(dirStruct)) )
         for k, value in dirStruct.items():
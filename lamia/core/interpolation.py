@@ -31,18 +31,208 @@ strings from environment variables.
 
 Interpolation methods may be defined and added dynamically into the special
 processor entity.
+
+Strings are parsed once into the sequence of literal and reference segments
+(see `compiled_template()'), so the interpolation is performed by a single
+join of the resolved parts.
 """
-import re, logging, yaml
+import re, logging, yaml, time, os, threading, collections, contextlib \
+     , concurrent.futures, copy
 import lamia.core.configuration
+from functools import lru_cache
 
 rxsPattern = r'\$\((?P<name>[a-zA-Z_][a-zA-Z1-9_]*):(?P<identifier>(?:(?:(?:\\[($)])|[^($)])*))\)'
+# Max depth of nested substitutions (references resolved to the strings with
+# further references)
 maxSubst = 255
+# Number of compiled strings kept in cache
+gCompiledTemplatesCacheSize = 8192
+# Number of parsed included YAML documents kept in cache
+gIncludesCacheSize = 256
+# Number of threads resolving the references of I/O-bound interpolators
+# concurrently (see `Processor.prefetching()')
+gIOWorkersEnvVar = 'LAMIA_INTERPOLATION_IO_WORKERS'
+gIOWorkersDefault = 8
+# Guards lazy creation of the per-thread state of the processors
+gProcessorLocalLock = threading.Lock()
+# Collection types that may be substituted by the full match of reference
+# (incl. the read-only views of the memoized configuration values)
+gCollections = (list, dict, set, frozenset)
+
+gRx = re.compile(rxsPattern)
+
+class Reference(tuple):
+    """
+    Reference segment of compiled string: (group, identifier) pair.
+    """
+    __slots__ = ()
+
+@lru_cache(maxsize=gCompiledTemplatesCacheSize)
+def compiled_template(v):
+    """
+    Returns tuple of segments of given string: literal strings and
+    `Reference' instances, in order. For strings without references, the
+    tuple contains only the string itself.
+    """
+    segments = []
+    pos = 0
+    for m in gRx.finditer(v):
+        if m.start() != pos:
+            segments.append( v[pos:m.start()] )
+        segments.append( Reference((m.group('name'), m.group('identifier'))) )
+        pos = m.end()
+    if pos != len(v) or not segments:
+        segments.append( v[pos:] )
+    return tuple(segments)
+
+def file_stamp(path):
+    """
+    Returns (size, modification time) stamp of the file or None if it does
+    not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+class IncludeResolver(object):
+    """
+    Resolves the "!include" YAML tags. Relative paths are resolved w.r.t. the
+    including file (the files being parsed are tracked per thread, see
+    `parsing()'; outside of them the paths are relative to the current
+    working dir). Parsed documents are cached, keyed by the file's real path
+    and stamp (size, modification time) and validated by the stamps of the
+    files they (transitively) include. The include graph is recorded, so the
+    dependencies of any parsed file are known (see `dependencies()').
+    Including documents get the copies of the cached ones, so they may be
+    modified by the consumers of the loaded YAML.
+    """
+    def __init__(self, maxSize=gIncludesCacheSize):
+        self.maxSize = maxSize
+        # real path -> (stamp, {dependency : stamp}, document)
+        self._cache = collections.OrderedDict()
+        # real path -> set of real paths of included files
+        self._graph = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def parsing(self, path):
+        """
+        Context manager marking the file as being parsed within the current
+        thread. The includes recorded for the file before are dropped.
+        """
+        path = os.path.realpath(path)
+        files = getattr(self._local, 'files', None)
+        if files is None:
+            files = self._local.files = []
+        with self._lock:
+            self._graph.pop(path, None)
+        files.append(path)
+        try:
+            yield path
+        finally:
+            files.pop()
+
+    def current(self):
+        """
+        Returns real path of the file being parsed in current thread, if any.
+        """
+        files = getattr(self._local, 'files', None)
+        return files[-1] if files else None
+
+    def resolve(self, name):
+        """
+        Returns the real path of the file referred by the include tag.
+        """
+        name = os.path.expanduser(name)
+        cur = self.current()
+        if cur is not None and not os.path.isabs(name):
+            name = os.path.join(os.path.dirname(cur), name)
+        return os.path.realpath(name)
+
+    def dependencies(self, path):
+        """
+        Returns set of real paths of the files included by given one
+        (transitively), as recorded by the last parsing.
+        """
+        deps = set()
+        with self._lock:
+            pending = list(self._graph.get(os.path.realpath(path), ()))
+            while pending:
+                p = pending.pop()
+                if p in deps:
+                    continue
+                deps.add(p)
+                pending += self._graph.get(p, ())
+        return deps
+
+    def stamps(self, path):
+        """
+        Returns {path : stamp} dictionary for the files included by given
+        one (transitively).
+        """
+        return { p : file_stamp(p) for p in self.dependencies(path) }
+
+    def load(self, name):
+        """
+        Returns parsed YAML document from the file referred by the include
+        tag, recording the include within the graph.
+        """
+        path = self.resolve(name)
+        cur = self.current()
+        if path == cur or path in getattr(self._local, 'files', ()):
+            raise RecursionError( 'Recursive inclusion of "%s".'%path )
+        if cur is not None:
+            with self._lock:
+                self._graph.setdefault(cur, set()).add(path)
+        stamp = file_stamp(path)
+        if stamp is None:
+            raise FileNotFoundError( 'Included file "%s" not found.'%path )
+        with self._lock:
+            entry = self._cache.get(path, None)
+            if entry is not None:
+                self._cache.move_to_end(path)
+        if entry is not None and entry[0] == stamp \
+        and all( file_stamp(p) == s for p, s in entry[1].items() ):
+            # Keep the (transitive) dependencies of the cached document
+            with self._lock:
+                self._graph.setdefault(path, set()).update(entry[1])
+            return copy.deepcopy(entry[2])
+        with self.parsing(path):
+            with open(path) as f:
+                doc = yaml.load(f, Loader=gIncludeLoader)
+        deps = self.stamps(path)
+        with self._lock:
+            self._cache[path] = (stamp, deps, doc)
+            while len(self._cache) > self.maxSize:
+                self._cache.popitem(last=False)
+        return copy.deepcopy(doc)
+
+    def invalidate(self, path=None):
+        """
+        Drops cached documents of given file and of ones including it
+        (transitively), or of all the files, if path is not given.
+        """
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+                return
+            path = os.path.realpath(path)
+            for p in list(self._cache.keys()):
+                if p == path or path in self._cache[p][1]:
+                    del self._cache[p]
+
+gIncludeLoader = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+gIncludes = IncludeResolver()
 
 def yaml_include(loader, node):
-    with open(node.value) as f:
-        return yaml.load(f)
+    return gIncludes.load(loader.construct_scalar(node))
 
 yaml.add_constructor("!include", yaml_include)
+if hasattr(yaml, 'CFullLoader'):
+    yaml.add_constructor("!include", yaml_include, Loader=yaml.CFullLoader)
 
 class InterpolationTypeError(TypeError):
     def __init__( self, t ):
@@ -50,22 +240,241 @@ class InterpolationTypeError(TypeError):
         super().__init__( "Unexpected type \"%s\" is given to string"
                     " interpolation callable."%str(t) )
 
+class PlainMarks(object):
+    """
+    Marks of the data subtrees (dicts, lists, sets) containing no
+    interpolation markers: the subtrees are scanned once and the result is
+    cached by containers identity, so the `Processor' returns the plain
+    subtrees as is, without walking or copying them. The containers modified
+    in place have to be forgotten (see `forget()').
+    """
+    def __init__(self):
+        # id -> (container, is plain)
+        self._marks = {}
+
+    def __call__(self, v):
+        """
+        Returns whether the value contains no interpolation markers.
+        """
+        t = type(v)
+        if t is str:
+            return '$(' not in v
+        if t is not dict and t is not list and t is not set:
+            return True
+        m = self._marks.get(id(v), None)
+        if m is not None and m[0] is v:
+            return m[1]
+        plain = all(map(self, v.values() if t is dict else v))
+        self._marks[id(v)] = (v, plain)
+        return plain
+
+    def forget(self, v):
+        self._marks.pop(id(v), None)
+
+    def clear(self):
+        self._marks.clear()
+
 class Processor(dict):
     """
     String interpolation callable.
+    Processor may refer to a parent one, in which case interpolators that are
+    not defined locally are taken from the parent (so the scoped processors
+    may override, e.g. the self-referencing interpolator without affecting
+    the shared one).
+
+    Results of the pure interpolators (ones having true `pure' attribute, or
+    listed in the `pure' set of the processor defining them) are memoized
+    per identifier by the defining processor, so they are invoked once for
+    the same identifier until `invalidate()' is called or the interpolator
+    is re-defined.
+
+    The I/O-bound interpolators (having true `ioBound' attribute, or listed
+    in the `ioBound' set of the processor defining them) may be invoked
+    concurrently for all the references found in the data prior to the
+    interpolation (see `resolve()', `prefetching()').
     """
-    def __init__(self):
+    def __init__(self, parent=None):
         """
         Trivial ctr.
         """
-        self.rx = re.compile(rxsPattern)
+        self.rx = gRx
+        self.parent = parent
+        # Names of the groups whose results are memoized
+        self.pure = set()
+        # group -> {identifier : result}, for pure interpolators
+        self._results = {}
+        # Names of the groups with I/O-bound interpolators
+        self.ioBound = set()
+        # Number of active `prefetching()' blocks; per-thread state (created
+        # on demand, see `_thread_local()')
+        self._nPrefetching = 0
+        self._local = None
 
-    def __call__(self, v):
+    def _thread_local(self):
+        """
+        Returns the `threading.local' instance keeping the per-thread state
+        of the processor.
+        """
+        if self._local is None:
+            with gProcessorLocalLock:
+                if self._local is None:
+                    self._local = threading.local()
+        return self._local
+
+    @property
+    def tracked(self):
+        """
+        When set to a set instance, the (group, identifier) pairs resolved
+        during interpolation within current thread will be collected within
+        (used to track the dependencies of interpolated values).
+        """
+        if self._local is None:
+            return None
+        return getattr(self._local, 'tracked', None)
+
+    @tracked.setter
+    def tracked(self, v):
+        self._thread_local().tracked = v
+
+    def __setitem__(self, k, v):
+        dict.__setitem__(self, k, v)
+        self._results.pop(k, None)
+
+    def __delitem__(self, k):
+        dict.__delitem__(self, k)
+        self._results.pop(k, None)
+
+    def _owner(self, k):
+        """
+        Returns the processor defining the interpolator (self or one of the
+        parents).
+        """
+        p = self
+        while not dict.__contains__(p, k):
+            p = p.parent
+            if p is None:
+                raise KeyError(k)
+        return p
+
+    def invalidate(self, group=None, identifier=None):
+        """
+        Drops memoized results of the pure interpolator (or of all the
+        interpolators defined by this processor, if group is not given). If
+        identifier is given, only the result for it is dropped.
+        """
+        if group is None:
+            self._results.clear()
+            return
+        results = self._owner(group)._results
+        if identifier is None:
+            results.pop(group, None)
+        elif group in results:
+            results[group].pop(identifier, None)
+
+    def _is_io_bound(self, nm):
+        owner = self._owner(nm)
+        return nm in owner.ioBound \
+            or getattr(dict.__getitem__(owner, nm), 'ioBound', False)
+
+    def pending_references(self, v, marks=None):
+        """
+        Returns set of (group, identifier) references of the I/O-bound
+        interpolators found within the given value (the references with
+        nested interpolation are omitted since they are known only after
+        the interpolation).
+        """
+        refs = set()
+        stack = [v]
+        while stack:
+            v = stack.pop()
+            t = type(v)
+            if t is str:
+                if '$(' not in v:
+                    continue
+                for seg in compiled_template(v):
+                    if type(seg) is str or '$(' in seg[1] or seg[0] not in self:
+                        continue
+                    if self._is_io_bound(seg[0]):
+                        refs.add( (seg[0], seg[1]) )
+            elif t is lamia.core.configuration.Configuration:
+                stack.append(v._store)
+            elif t is dict or t is list or t is set:
+                if marks is not None and marks(v):
+                    continue
+                stack.extend( v.values() if t is dict else v )
+        return refs
+
+    @contextlib.contextmanager
+    def prefetching(self, v, marks=None, workers=None):
+        """
+        Context manager invoking the I/O-bound interpolators for all the
+        references found in the value concurrently, on the pool of `workers'
+        threads (default is defined by `gIOWorkersEnvVar'). Within the block,
+        interpolation performed in the current thread takes the prefetched
+        results instead of invoking the interpolators, so the result is
+        identical to the sequential interpolation (exceptions are re-raised
+        when the reference is interpolated).
+        """
+        refs = self.pending_references(v, marks)
+        if workers is None:
+            workers = int(os.environ.get(gIOWorkersEnvVar, gIOWorkersDefault))
+        results = {}
+        # Memoized results of pure interpolators are not re-fetched
+        refs = sorted( r for r in refs if not self._cached(r) )
+        def _call(ref):
+            try:
+                return self[ref[0]](ref[1]), None
+            except Exception as e:
+                return None, e
+        if refs and workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(min(workers, len(refs))) as pool:
+                for ref, r in zip(refs, pool.map(_call, refs)):
+                    results[ref] = r
+        # Per-thread stack of the prefetched results:
+        # {(group, identifier) : (result, exception)}
+        local = self._thread_local()
+        stack = getattr(local, 'prefetched', None)
+        if stack is None:
+            stack = local.prefetched = []
+        stack.append(results)
+        self._nPrefetching += 1
+        try:
+            yield results
+        finally:
+            self._nPrefetching -= 1
+            stack.pop()
+
+    def _cached(self, ref):
+        """
+        Returns whether the result for the reference is memoized.
+        """
+        owner = self._owner(ref[0])
+        return ref[1] in owner._results.get(ref[0], ())
+
+    def resolve(self, v, marks=None, workers=None):
+        """
+        Performs interpolation of the value as `__call__()' does, invoking
+        the I/O-bound interpolators concurrently (see `prefetching()').
+        """
+        with self.prefetching(v, marks=marks, workers=workers):
+            return self(v, marks)
+
+    def __missing__(self, k):
+        if self.parent is None:
+            raise KeyError(k)
+        return self.parent[k]
+
+    def __contains__(self, k):
+        return dict.__contains__(self, k) \
+            or (self.parent is not None and k in self.parent)
+
+    def __call__(self, v, marks=None):
         """
         Performs interpolation for collections: dicts, lists, sets or forwards
-        single string interpolation to interpolate_str() method.
+        single string interpolation to interpolate_str() method. If the
+        `PlainMarks' instance is given, the collections without the
+        interpolation markers are returned as is.
         """
-        L = logging.getLogger('lamia.interpolation')
         if v is None:
             return None
         t = type(v)
@@ -77,18 +486,25 @@ class Processor(dict):
         elif t is str:
             return self.interpolate_str(v)
         elif t is dict or t is lamia.core.configuration.Configuration:
+            if marks is not None and t is dict and marks(v):
+                return v
             ret = {}
             for k, v in v.items():
                 try:
-                    ret[k] = self(v)
+                    ret[k] = self(v, marks)
                 except Exception:
+                    L = logging.getLogger('lamia.interpolation')
                     L.error( 'Within "%s":'%k )
                     raise
             return ret
         elif t is list:
-            ret = list(map(self, v))
+            if marks is not None and marks(v):
+                return v
+            ret = [ self(e, marks) for e in v ]
         elif t is set:
-            ret = set(map(self, v))
+            if marks is not None and marks(v):
+                return v
+            ret = set( self(e, marks) for e in v )
         # elif ...
         else:
             #raise InterpolationTypeError( t )
@@ -99,61 +515,94 @@ class Processor(dict):
         """
         Performs substitution within given string.
         """
-        # We do the while True loop here instead of finditer() or whatever
-        # because of the fact the string substitution will usually change
-        # the string positions, so each time the search has to be re-run.
-        iv = v
-        substCount = 0
-        while True and substCount != maxSubst:
-            m = self.rx.search( v )
-            if not m:
-                break
-            nm, idnt = m.group('name'), m.group('identifier')
-            if nm not in self.keys():
-                raise KeyError("Unknown parameter interpolation \"%s\"."%nm)
-            ret = self[nm](idnt)
-            if ret is None:
-                # If you've got this error, but intended returning an empty
-                # interpolation, consider using of empty string instead.
-                raise RuntimeError('Parameter interpolation \"%s\" returned' \
-                        ' None.'%nm)
-            elif type(ret) is str:
+        stats = lamia.core.configuration.gStats
+        if stats is None:
+            return self._interpolate_str(v)
+        t0 = time.perf_counter()
+        try:
+            return self._interpolate_str(v, stats)
+        finally:
+            stats.interpolationTime += time.perf_counter() - t0
+
+    def _resolve(self, ref, stats):
+        nm, idnt = ref
+        try:
+            owner = self._owner(nm)
+        except KeyError:
+            raise KeyError("Unknown parameter interpolation \"%s\"."%nm)
+        tracked = self.tracked
+        if tracked is not None:
+            tracked.add( (nm, idnt) )
+        if stats is not None:
+            stats.interpolations[nm] += 1
+        fn = dict.__getitem__(owner, nm)
+        if nm in owner.pure or getattr(fn, 'pure', False):
+            results = owner._results.get(nm, None)
+            if results is None:
+                results = owner._results[nm] = {}
+            elif idnt in results:
+                return results[idnt]
+        else:
+            results = None
+        if self._nPrefetching and getattr(self._local, 'prefetched', None):
+            pre = self._local.prefetched[-1].get( (nm, idnt), None )
+        else:
+            pre = None
+        if pre is None:
+            ret = fn(idnt)
+        elif pre[1] is not None:
+            raise pre[1]
+        else:
+            ret = pre[0]
+        if ret is None:
+            # If you've got this error, but intended returning an empty
+            # interpolation, consider using of empty string instead.
+            raise RuntimeError('Parameter interpolation \"%s\" returned' \
+                    ' None.'%nm)
+        if results is not None:
+            results[idnt] = ret
+        return ret
+
+    def _interpolate_str(self, v, stats=None, depth=0):
+        # Strings substituted by references are interpolated recursively,
+        # as well as the result of the substitution (so the nested references
+        # like "$(ENV:$(value:name))" are supported).
+        if depth == maxSubst:
+            raise RecursionError('Recursive or too complex substitution'
+                    ' detected for expression "%s".'%v )
+        segments = compiled_template(v)
+        if len(segments) == 1:
+            ref = segments[0]
+            if type(ref) is str:
+                return v
+            ret = self._resolve(ref, stats)
+            if type(ret) is str:
+                return self._interpolate_str(ret, stats, depth + 1)
+            if type(ret) in (int, float) or isinstance(ret, gCollections):
+                return ret
+            # TODO: elif type(ret) is ConfDifferencies ...
+            raise RuntimeError('Interpolation of type "%s" is not'
+                    ' supported.'%str(type(ret)) )
+        parts = []
+        for seg in segments:
+            if type(seg) is str:
+                parts.append(seg)
+                continue
+            ret = self._resolve(seg, stats)
+            if type(ret) is str:
                 # We treat strings intepolation as a classic strings
                 # substitution.
-                #return re.sub(self.rx, ret, v)
-                v = v[:m.start()] + ret + v[m.end():]
-            elif type(ret) in (int, float):
-                # Only full match is supported.
-                if m.start() != 0 or m.end() != len(iv):
-                    raise RuntimeError('Extra symbols on for'
-                            ' int/float substitution in "%s".'%iv)
-                return ret
-            elif type(ret) is list:
-                # Only full match is supported.
-                if m.start() != 0 or m.end() != len(iv):
-                    raise RuntimeError('Extra symbols on for'
-                            ' list substitution in "%s".'%iv)
-                return ret
-            elif type(ret) is dict:
-                # Only full match is supported.
-                if m.start() != 0 or m.end() != len(iv):
-                    raise RuntimeError('Extra symbols on for'
-                            ' dict substitution in "%s".'%iv)
-                return ret
-            elif type(ret) is set:
+                parts.append(ret)
+            elif type(ret) in (int, float) or isinstance(ret, gCollections):
                 # Only full match is supported.
-                if m.start() != 0 or m.end() != len(iv):
-                    raise RuntimeError('Extra symbols on for'
-                            ' set substitution in "%s".'%iv)
-                return ret
-            # TODO: elif type(ret) is ConfDifferencies ...
+                raise RuntimeError('Extra symbols on for %s substitution'
+                        ' in "%s".'%(type(ret).__name__, v))
             else:
                 raise RuntimeError('Interpolation of type "%s" is not'
                         ' supported.'%str(type(ret)) )
-            substCount += 1
-        if substCount == maxSubst:
-            raise RecursionError('Recursive or too complex substitution'
-                    ' detected for expression "%s".'%iv )
+        v = ''.join(parts)
+        if '$(' in v:
+            return self._interpolate_str(v, stats, depth + 1)
         return v
 
 class DictInterpolator(dict):
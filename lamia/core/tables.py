@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018 Renat R. Dusaev <crank@qcrypt.org>
+# Author: Renat R. Dusaev <crank@qcrypt.org>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of
+# this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Tabular context sources.
+
+Large run catalogues are more naturally expressed as tables than as YAML
+lists. This module offers column-wise storage of tabular data read from CSV,
+JSON-lines and NumPy's `.npy'/`.npz' files. The `Table' is a mapping of
+column names to `Column' sequences; the columns keep the data in compact
+arrays (`array.array' for numerical data, NumPy arrays for NumPy sources)
+and are consumed by the path-templates product machinery directly (see
+`lamia.core.filesystem.dict_product()'): columns of the same table are
+iterated together, row by row, instead of producing the cartesian product.
+
+NumPy is optional and required only for `.npy'/`.npz' files.
+"""
+
+import csv, json, array, collections, os.path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Column(collections.Sequence):
+    """
+    Single column of the `Table'. Wraps the array-like data, the items are
+    returned as native Python scalars.
+    """
+    __slots__ = ('name', 'table', 'data')
+
+    def __init__(self, name, data, table=None):
+        self.name = name
+        self.data = data
+        self.table = table
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, n):
+        v = self.data[n]
+        if isinstance(n, slice):
+            return Column(self.name, v)
+        return v.item() if hasattr(v, 'item') else v
+
+    def __iter__(self):
+        if hasattr(self.data, 'tolist'):
+            return iter(self.data.tolist())
+        return iter(self.data)
+
+    def tolist(self):
+        return self.data.tolist() if hasattr(self.data, 'tolist') else list(self.data)
+
+    def __repr__(self):
+        return '<Column %s of %d entries>'%(self.name, len(self))
+
+class Table(collections.Mapping):
+    """
+    Column-wise table: ordered mapping of column names to `Column' instances
+    of the same length.
+    """
+    def __init__(self, columns):
+        self._columns = collections.OrderedDict()
+        nRows = None
+        for name, data in columns.items():
+            if nRows is None:
+                nRows = len(data)
+            elif nRows != len(data):
+                raise ValueError( 'Column "%s" has %d rows while %d is'
+                        ' expected.'%(name, len(data), nRows) )
+            self._columns[name] = Column(name, data, table=self)
+        self.nRows = nRows or 0
+
+    def __getitem__(self, k):
+        return self._columns[k]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def rows(self, columns=None):
+        """
+        Returns iterator over the row tuples of given (or all) columns.
+        """
+        if columns is None:
+            columns = list(self._columns.keys())
+        return zip(*[self._columns[c] for c in columns])
+
+    def __getstate__(self):
+        return collections.OrderedDict( (k, c.data) for k, c in self._columns.items() )
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return '<Table of %d rows, columns: %s>'%(self.nRows, ', '.join(self._columns))
+
+def _packed(values):
+    """
+    Returns compact array for homogeneous numerical values, or the list
+    otherwise.
+    """
+    if values and all(type(v) is int for v in values):
+        try:
+            return array.array('q', values)
+        except OverflowError:
+            return values
+    if values and all(type(v) in (int, float) for v in values):
+        return array.array('d', values)
+    return values
+
+def _zero_padded(s):
+    """
+    Returns whether the string is a number with leading zeros (e.g. the
+    "007" identifier) that would be lost on conversion.
+    """
+    s = s.lstrip('+-')
+    return len(s) > 1 and '0' == s[0] and s[1].isdigit()
+
+def _converted_column(values):
+    """
+    Returns the column values converted to numbers if every value is a
+    number: integers if all of them are, floats otherwise. Other columns
+    (including the ones with blank or zero-padded values) are kept as
+    strings.
+    """
+    if any(map(_zero_padded, values)):
+        return values
+    for t in (int, float):
+        try:
+            return [t(v) for v in values]
+        except ValueError:
+            pass
+    return values
+
+def parse_csv_file(path):
+    """
+    Reads CSV file with header line into `Table'. Numerical columns are
+    detected and stored in arrays; columns with any non-numerical, blank or
+    zero-padded (like identifiers) value are kept as strings.
+    """
+    with open(path, newline='') as f:
+        rd = csv.reader(f)
+        header = next(rd)
+        cols = [[] for _ in header]
+        for n, row in enumerate(rd):
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError( '%s:%d: %d fields while %d expected.'%(
+                    path, n + 2, len(row), len(header)) )
+            for c, v in zip(cols, row):
+                c.append(v)
+    return Table(collections.OrderedDict( (h, _packed(_converted_column(c))) \
+                                          for h, c in zip(header, cols) ))
+
+def parse_json_lines_file(path):
+    """
+    Reads JSON-lines file (one JSON object per line) into `Table'. Columns
+    are the union of objects' keys, missing values are set to None.
+    """
+    cols = collections.OrderedDict()
+    nRows = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            for k in obj.keys():
+                if k not in cols:
+                    cols[k] = [None]*nRows
+            for k, c in cols.items():
+                c.append(obj.get(k, None))
+            nRows += 1
+    return Table(collections.OrderedDict( (k, _packed(c)) for k, c in cols.items() ))
+
+def parse_numpy_file(path):
+    """
+    Reads NumPy's `.npy' or `.npz' file into `Table'. The fields of the
+    structured array or the arrays of `.npz' archive become the columns; the
+    plain 1-D array becomes the single column named "value".
+    """
+    if numpy is None:
+        raise RuntimeError( 'NumPy is required to read "%s".'%path )
+    d = numpy.load(path, allow_pickle=False)
+    if isinstance(d, numpy.ndarray):
+        if d.dtype.names:
+            return Table(collections.OrderedDict( (n, d[n]) for n in d.dtype.names ))
+        if 1 != d.ndim:
+            raise ValueError( 'Only 1-D arrays are supported as columns'
+                    ' ("%s" is of shape %s).'%(path, str(d.shape)) )
+        return Table({'value' : d})
+    with d:
+        return Table(collections.OrderedDict( (n, d[n]) for n in d.files ))
+
+# Tabular sources extensions -> parsing function
+gTableParsers = {
+        '.csv' : parse_csv_file,
+        '.jsonl' : parse_json_lines_file,
+        '.ndjson' : parse_json_lines_file,
+        '.npy' : parse_numpy_file,
+        '.npz' : parse_numpy_file
+    }
+
+def table_parser(path):
+    """
+    Returns parsing function for the tabular file by its extension, or None.
+    """
+    return gTableParsers.get(os.path.splitext(path)[1].lower(), None)
@@ -95,7 +95,8 @@ class Task(object):
                 self._argNames.add( name if name else shortcut )
                 assert( name or shortcut )
                 if name and name in self._userDefaults:
-                    pDescr['default'] = self._userDefaults[name]
+                    # Descriptions read from configuration are read-only
+                    pDescr = dict(pDescr, default=self._userDefaults[name])
                     L.debug( '{name} default is set/overriden by users {value}'.format(
                         name=name if name else shortcut, value=self._userDefaults[name] ) )
                     usedUserDfts.add(name)
@@ -25,11 +25,12 @@ Uses jinja2 as template-rendering framework to produce dynamic templates.
 """
 
 
-import yaml, os, fnmatch, logging, datetime, copy, re
+import yaml, os, fnmatch, logging, datetime, copy, re, collections
 #import jinja2schema  # TODO: 1-vars-infer
 import jinja2 as j2
 import jinja2.lexer, jinja2.ext, jinja2.exceptions, jinja2.nodes
 import lamia.core.configuration as LC
+import lamia.core.interpolation
 import lamia.core.filesystem as FS
 
 from jinja2 import nodes
@@ -142,7 +143,8 @@ class Loader(j2.BaseLoader):
         _discover_templates() and has to return (content, modtime) tuple.
         """
         L = logging.getLogger(__name__)
-        with open(fPath) as f:
+        with open(fPath) as f, \
+             lamia.core.interpolation.gIncludes.parsing(fPath):
             try:
                 content = yaml.load(f, Loader=yaml.FullLoader)
                 mt = os.path.getmtime(fPath)
@@ -261,14 +263,29 @@ class _RecursiveTemplatesHandler(object):
     def __init__( self, renderers={} ):
         self.renderers = renderers
 
+    @staticmethod
+    def _render( renderer, tID, context ):
+        """
+        Invokes the renderer with the context given as mapping. Renderers
+        providing `render_mapping()' consume the `Stack' lazily (via
+        `StackView'), others receive it as keyword arguments.
+        """
+        if isinstance(context, LC.Stack):
+            context = context.view()
+        if hasattr(renderer, 'render_mapping'):
+            return renderer.render_mapping(tID, context)
+        return renderer(tID, **context)
+
     def __call__( self, template, destStream, path=None
                 , context={}, contextHooks={} ):
         L = logging.getLogger('lamia.templates')
         rTxt = None
         if type(template) is str:
-            rTxt = self.renderers['default'](template, **context)
-        elif type(template) is dict:
-            ctxStk = LC.Stack(dict(context))
+            rTxt = self._render(self.renderers['default'], template, context)
+        elif isinstance(template, dict):
+            # Shares the layers of the context stack, so pushing the hooks
+            # does not copy the context
+            ctxStk = LC.Stack(context)
             # TODO: document context hooks technique
             for ctxHookName in template.get('contextHooks', []):
                 ctxh = contextHooks[ctxHookName]
@@ -279,12 +296,12 @@ class _RecursiveTemplatesHandler(object):
                     v = ctxh
                 ctxStk.push(v, tag=ctxHookName)
             if 'id' in template.keys():
-                rTxt = self.renderers[template.get('class', 'default')]( template['id']
-                        , **ctxStk)
+                rTxt = self._render( self.renderers[template.get('class', 'default')]
+                        , template['id'], ctxStk )
             elif 'class' in template.keys():
                 if template['class'] is not None:
-                    rTxt = self.renderers[template.get('class', 'default')]( template
-                        , **ctxStk)
+                    rTxt = self._render( self.renderers[template.get('class', 'default')]
+                        , template, ctxStk )
                 else:
                     return
                     # ^^^ The case of class: None has to remain possible, and
@@ -308,6 +325,9 @@ class PlainTextRenderer(object):
     def __call__(self, tID, **unused):
         return self.dct[tID]
 
+    def render_mapping(self, tID, context):
+        return self.dct[tID]
+
 class Templates(object):
     """
     Default templates renderer.
@@ -359,6 +379,24 @@ class Templates(object):
             L.error(' ..during rendering of template "%s"'%templateName )
             raise
 
+    def render_mapping(self, templateName, context):
+        """
+        Renders template identified by templateName with the given mapping
+        (e.g. `lamia.core.configuration.StackView') as context. Unlike the
+        `__call__()', the mapping is not copied: the template retrieves only
+        the entries it refers to (the template module is evaluated with the
+        shared context, that is the mapping itself).
+        """
+        L = logging.getLogger(__name__)
+        try:
+            t = self.env.get_template(templateName)
+            return str(t.make_module( collections.ChainMap( {'ctx' : self.loaderInterpolators}
+                                                          , context, t.globals )
+                                    , shared=True ))
+        except:
+            L.error(' ..during rendering of template "%s"'%templateName )
+            raise
+
     def __getitem__(self, k):
         return self.loaderInterpolators[k]
 
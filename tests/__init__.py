@@ -0,0 +1,19 @@
+import os
+
+def _restore_environ(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+class EnvironmentMixin(object):
+    """
+    Mix-in for the test cases modifying the environment variables: the
+    original values are restored at clean up.
+    """
+    def set_environ(self, name, value):
+        """
+        Sets (or, for None, unsets) the environment variable.
+        """
+        self.addCleanup(_restore_environ, name, os.environ.get(name, None))
+        _restore_environ(name, value)
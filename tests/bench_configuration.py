@@ -0,0 +1,78 @@
+"""
+Micro-benchmarks for configuration lookups. Not a part of the unit tests
+suite; run it manually:
+    $ python -m tests.bench_configuration
+"""
+
+import timeit, dpath.util
+from lamia.core.configuration import Configuration, Stack, compiled_path
+
+gKeys = [ 'execs.condorSubmit', 'timeouts.condorSubmit', 'classAds.submit'
+        , 'classAds.submit.universe', 'some.deeply.nested.entry.here' ]
+
+gCfg = {
+        'execs' : { 'condorSubmit' : 'condor_submit', 'condorWait' : 'condor_wait' },
+        'timeouts' : { 'condorSubmit' : 30, 'condorWait' : 60 },
+        'classAds' : { 'submit' : { 'universe' : 'vanilla', 'getenv' : True } },
+        'some' : { 'deeply' : { 'nested' : { 'entry' : { 'here' : 42 } } } }
+    }
+
+def report(name, fn, number=20000):
+    t = min(timeit.repeat(fn, number=number, repeat=5))
+    print( '%-40s %12.0f lookups/s'%(name, number*len(gKeys)/t) )
+    return t
+
+def main():
+    cfg = Configuration(gCfg)
+    def _dpath():
+        for k in gKeys:
+            dpath.util.get(gCfg, k, separator='.')
+    def _compiled():
+        for k in gKeys:
+            compiled_path(k).get(gCfg)
+    def _cfg():
+        for k in gKeys:
+            cfg[k]
+    tBefore = report( 'dpath.util.get()', _dpath )
+    tAfter = report( 'compiled_path().get()', _compiled )
+    report( 'Configuration.__getitem__()', _cfg )
+    print( 'Speedup of compiled accessor: x%.1f'%(tBefore/tAfter) )
+    for depth in (1, 10, 100):
+        stk = Stack([gCfg] + [{'layer%d'%n : n} for n in range(depth)])
+        def _stk():
+            for k in gKeys:
+                stk[k]
+        report( 'Stack.__getitem__(), depth %d'%depth, _stk, number=5000 )
+    big = { 'runs' : { str(n) : { 'n' : n, 'files' : ['a', 'b'] } for n in range(10000) } }
+    stk = Stack([big])
+    ctx = Configuration(big)
+    t = min(timeit.repeat( lambda: (stk.push(ctx, tag='f'), stk.pop(tag='f'))
+                         , number=1000, repeat=5 ))
+    print( '%-40s %12.1f us'%('Stack.push()/pop() of 10k-entries conf', t*1e3) )
+    # Glob queries: 2k runs with 10 detectors each, 20 matches
+    runs = { 'runs' : { str(n) : { 'detectors' : { 'd%d'%m : { 'enabled' : True
+                                                            , 'gain' : m }
+                                                  for m in range(10) } }
+                        for n in range(2000) } }
+    cfg = Configuration(runs)
+    pattern = 'runs.1[0-9].detectors.d0.enabled'
+    assert( len(cfg.search(pattern)) == 10 )
+    for name, fn in ( ('dpath.util.search()', lambda: list(dpath.util.search( runs
+                                        , pattern, separator='.', yielded=True )))
+                    , ('Configuration.search()', lambda: cfg.search(pattern)) ):
+        t = min(timeit.repeat(fn, number=10, repeat=3))
+        print( '%-40s %12.1f us/query'%(name, t*1e5) )
+    # Repeated (memoized) reads of the subtrees of different size; the time
+    # must not depend on the size, since no copy is made
+    ts = []
+    for size in (10, 100000):
+        cfg = Configuration({ 'lst' : list(range(size))
+                            , 'dct' : { str(n) : n for n in range(size) } })
+        cfg['lst'], cfg['dct']
+        ts.append( min(timeit.repeat( lambda: (cfg['lst'], cfg['dct'])
+                                    , number=10000, repeat=5 )) )
+        print( '%-40s %12.2f us'%('Repeated read, subtree of %d'%size, ts[-1]*1e2) )
+    assert( ts[1] < 5*ts[0] )
+
+if "__main__" == __name__:
+    main()
@@ -0,0 +1,37 @@
+"""
+Micro-benchmarks for string interpolation. Not a part of the unit tests
+suite; run it manually:
+    $ python -m tests.bench_interpolation
+"""
+
+import timeit
+from lamia.core.interpolation import Processor, DictInterpolator
+
+gSubst = DictInterpolator({ 'user' : 'crank', 'host' : 'lxplus', 'n' : '42'
+                          , 'nested' : '$(SMPL:user)@$(SMPL:host)' })
+
+gStrings = { 'plain string' : 'no references in this string at all'
+           , 'single ref' : '$(SMPL:user)'
+           , '3 refs' : '$(SMPL:user)@$(SMPL:host):/data/$(SMPL:n)'
+           , 'nested ref' : 'ssh $(SMPL:nested)'
+           , '50 refs' : '/'.join(['$(SMPL:n)']*50) }
+
+def main():
+    p = Processor()
+    p['SMPL'] = gSubst
+    for name, s in gStrings.items():
+        p(s)
+        t = min(timeit.repeat(lambda: p(s), number=10000, repeat=5))
+        print( '%-40s %12.2f us/string'%(name, t*1e2) )
+    # Plain (reference-free) subtree of 1k runs with 10 entries each
+    from lamia.core.interpolation import PlainMarks
+    tree = { 'runs' : { str(n) : { 'k%d'%m : 'value %d'%m for m in range(10) }
+                        for n in range(1000) } }
+    marks = PlainMarks()
+    for name, fn in ( ('plain subtree, walked', lambda: p(tree))
+                    , ('plain subtree, marked', lambda: p(tree, marks)) ):
+        t = min(timeit.repeat(fn, number=10, repeat=3))
+        print( '%-40s %12.2f us/tree'%(name, t*1e5) )
+
+if "__main__" == __name__:
+    main()
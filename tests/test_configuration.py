@@ -2,9 +2,29 @@
 Tests the merging of configuration dictionaries
 """
 
+import os, tempfile, shutil, copy
 import unittest as UT
 from lamia.core.configuration import Configuration \
-                                   , Stack as ConfigurationStack
+                                   , Stack as ConfigurationStack \
+                                   , compiled_path \
+                                   , ParseCache \
+                                   , parse_context_stream \
+                                   , gParseCacheDirEnvVar \
+                                   , gYAMLLoader \
+                                   , FrozenConfiguration \
+                                   , LazySection \
+                                   , gLazySectionsMinSizeEnvVar \
+                                   , enable_stats \
+                                   , disable_stats \
+                                   , compose_stack \
+                                   , StackSnapshot \
+                                   , section_accessor \
+                                   , SchemaValidationError \
+                                   , ConfigurationDelta \
+                                   , compute_delta \
+                                   , apply_delta \
+                                   , StackTagError
+from tests import EnvironmentMixin
 
 #
 # Confs
@@ -66,6 +86,158 @@ class ConfigurationHierarchicalSubstAdvanced(UT.TestCase):
     def test_depth(self):
         self.assertTrue(self.cfg['root.two.one'], [1, 2, 3])
 
+class ConfigurationLazyInterpolation(UT.TestCase):
+    def setUp(self):
+        self.cfg = Configuration({
+                'root' : { 'one' : 'one', 'two' : { 'one' : '$(value:root.one)' } },
+                'other' : 'x-$(value:root.two.one)',
+                'faulty' : '$(UNKNOWN:foo)'
+            })
+
+    def test_lazy(self):
+        # Construction must succeed despite faulty entry
+        with self.assertRaises(KeyError):
+            self.cfg['faulty']
+        self.assertEqual( self.cfg['other'], 'x-one' )
+
+    def test_memoized(self):
+        self.assertEqual( self.cfg['root.two'], self.cfg['root.two'] )
+        self.assertIn( 'root.two', self.cfg._memo )
+
+    def test_copy_self_tag(self):
+        cfg = Configuration({'a' : '$(CFG:b)', 'b' : 'x'}, selfInterpolationTag='CFG')
+        self.assertEqual( Configuration(cfg)['a'], 'x' )
+        self.assertEqual( ConfigurationStack([cfg])['a'], 'x' )
+
+    def test_modified_read(self):
+        d = self.cfg['root.two']
+        self.assertIs( d, self.cfg['root.two'] )
+        with self.assertRaises(TypeError):
+            d['k'] = 1
+        # Copies are plain and may be modified
+        d = copy.deepcopy(self.cfg['root'])
+        d['two']['k'] = 1
+        self.assertNotIn( 'k', self.cfg['root.two'] )
+        self.assertNotIn( 'k', self.cfg['root']['two'] )
+        cfg = Configuration({'lst' : [1, '$(value:other)'], 'other' : 2})
+        with self.assertRaises(TypeError):
+            cfg['lst'].append(3)
+        lst = copy.copy(cfg['lst'])
+        lst.append(3)
+        self.assertEqual( cfg['lst'], [1, 2] )
+
+    def test_invalidation(self):
+        self.assertEqual( self.cfg['other'], 'x-one' )
+        self.assertEqual( self.cfg['root']['two']['one'], 'one' )
+        self.cfg['root.one'] = 'uno'
+        self.assertEqual( self.cfg['other'], 'x-uno' )
+        self.assertEqual( self.cfg['root']['two']['one'], 'uno' )
+        del self.cfg['root.two']
+        self.assertFalse( 'root.two.one' in self.cfg )
+        self.assertEqual( self.cfg['root'], {'one' : 'uno'} )
+
+class ConfigurationMemoizedReferences(UT.TestCase):
+    def test_invalidation(self):
+        cfg = Configuration({ 'a' : 'one', 'b' : '$(value:a)', 'c' : { 'd' : '$(value:a)' } })
+        self.assertEqual( 'one', cfg['b'] )
+        self.assertIn( 'a', cfg._interpolators._results['value'] )
+        self.assertEqual( 'one', cfg['c.d'] )
+        cfg['a'] = 'two'
+        self.assertEqual( 'two', cfg['b'] )
+        self.assertEqual( 'two', cfg['c.d'] )
+
+    def test_plain_dict_interpolator(self):
+        from lamia.core.configuration import ConfigInterpolator
+        from lamia.core.interpolation import Processor
+        dct = { 'a' : 'one' }
+        p = Processor()
+        p['dct'] = ConfigInterpolator(dct)
+        self.assertEqual( 'one', p('$(dct:a)') )
+        dct['a'] = 'two'
+        self.assertEqual( 'two', p('$(dct:a)') )
+
+class ConfigurationReferencesResolution(UT.TestCase):
+    def setUp(self):
+        self.cfg = Configuration({ 'a' : '$(value:b)/a'
+                                 , 'b' : '$(value:c.d)/b'
+                                 , 'c' : { 'd' : '$(value:e)', 'f' : ['$(value:a)'] }
+                                 , 'e' : 'e' })
+
+    def test_chain(self):
+        self.assertEqual( 'e/b/a', self.cfg['a'] )
+        self.assertEqual( 'e/b', self.cfg._memo['b'] )
+        # transitive invalidation
+        self.cfg['e'] = 'E'
+        self.assertNotIn( 'b', self.cfg._memo )
+        self.assertEqual( 'E/b/a', self.cfg['a'] )
+        self.assertEqual( ['E/b/a'], self.cfg['c.f'] )
+
+    def test_resolve_all(self):
+        order = self.cfg.resolve_references()
+        self.assertEqual( 4, len(order) )
+        self.assertLess( order.index('c.d'), order.index('b') )
+        self.assertLess( order.index('b'), order.index('a') )
+        self.assertLess( order.index('a'), order.index('c.f.0') )
+        self.assertEqual( 'e/b/a', self.cfg._memo['c.f.0'] )
+
+    def test_deep_chain(self):
+        n = 2000
+        d = { 'k%d'%i : '$(value:k%d)'%(i + 1) for i in range(n) }
+        d['k%d'%n] = 'end'
+        self.assertEqual( 'end', Configuration(d)['k0'] )
+
+    def test_cycles(self):
+        from lamia.core.configuration import ReferenceCycleError
+        self.cfg['e'] = '$(value:b)'
+        with self.assertRaises(ReferenceCycleError) as ctx:
+            self.cfg['a']
+        self.assertEqual( ['b', 'c.d', 'e', 'b'], ctx.exception.chain )
+        with self.assertRaises(ReferenceCycleError) as ctx:
+            self.cfg.resolve_references()
+        self.assertEqual( ctx.exception.chain[0], ctx.exception.chain[-1] )
+        self.assertIsInstance( ctx.exception, RecursionError )
+        self.cfg['e'] = 'ok'
+        self.assertEqual( 'ok/b/a', self.cfg['a'] )
+
+class ConfigurationPlainSubtrees(UT.TestCase):
+    def test_marks(self):
+        data = { 'a' : { 'b' : [1, 2], 'c' : 'plain' }, 'd' : 'dee' }
+        cfg = Configuration(data)
+        self.assertEqual( data['a'], cfg['a'] )
+        # plain subtree is memoized as read-only view, returned on each read
+        self.assertEqual( data['a'], cfg._memo['a'] )
+        self.assertIs( cfg._memo['a'], cfg['a'] )
+        with self.assertRaises(TypeError):
+            cfg['a']['c'] = 'other'
+        cfg['a.c'] = '$(value:d)'
+        self.assertEqual( { 'b' : [1, 2], 'c' : 'dee' }, cfg['a'] )
+        self.assertEqual( data['a']['b'], cfg['a.b'] )
+        # original is intact and still plain for the copies sharing it
+        self.assertEqual( data['a']['c'], 'plain' )
+        cp = Configuration(data)
+        self.assertEqual( data['a'], cp['a'] )
+        cfg['a.c'] = 'plain again'
+        self.assertEqual( cfg._store['a'], cfg['a'] )
+
+class ConfigurationConcurrentResolve(UT.TestCase):
+    def test_resolve(self):
+        import lamia.core.interpolation as LI
+        class Lookup(object):
+            ioBound = True
+            def __init__(self):
+                self.calls = []
+            def __call__(self, v):
+                self.calls.append(v)
+                return v.upper()
+        procs = LI.Processor()
+        procs['DB'] = lookup = Lookup()
+        data = { 'a' : '$(DB:x)-$(value:b)', 'b' : '$(DB:y)', 'c' : { 'd' : ['$(DB:z)', 1] } }
+        cfg = Configuration(data, interpolators=procs)
+        r = cfg.resolve(workers=3)
+        self.assertEqual( { 'a' : 'X-Y', 'b' : 'Y', 'c' : { 'd' : ['Z', 1] } }, r )
+        self.assertEqual( ['x', 'y', 'z'], sorted(lookup.calls) )
+        self.assertEqual( r, Configuration(data, interpolators=procs).resolve(workers=1) )
+
 class ConfigurationCopyBehaviour(UT.TestCase):
     def setUp(self):
         self.cfg = Configuration({
@@ -79,6 +251,47 @@ class ConfigurationCopyBehaviour(UT.TestCase):
         self.cfg['two'] = obj
         #self.assertEqual( self.cfg['two'] is obj, dct['foo'] is obj )
 
+class ConfigurationCopyOnWrite(UT.TestCase):
+    def setUp(self):
+        self.dct = { 'a' : { 'b' : { 'c' : 1 }, 'lst' : [1, 2] }
+                   , 'd' : { 'e' : 2 } }
+        self.cfg = Configuration(self.dct)
+
+    def test_shared(self):
+        self.assertTrue( self.cfg._store is self.dct )
+        cp = Configuration(self.cfg)
+        self.assertTrue( cp._store is self.dct )
+
+    def test_isolated_modification(self):
+        cp = Configuration(self.cfg)
+        cp['a.b.c'] = 12
+        cp['a.lst.1'] = 3
+        cp['a.new.entry'] = 'new'
+        self.assertEqual( self.dct['a']['b']['c'], 1 )
+        self.assertEqual( self.dct['a']['lst'], [1, 2] )
+        self.assertFalse( 'new' in self.dct['a'] )
+        self.assertEqual( self.cfg['a.b.c'], 1 )
+        self.assertEqual( cp['a.b.c'], 12 )
+        self.assertEqual( cp['a.lst'], [1, 3] )
+        # untouched subtree is still shared
+        self.assertTrue( cp._store['d'] is self.dct['d'] )
+        # original modification does not affect the copy
+        self.cfg['d.e'] = 3
+        self.assertEqual( cp['d.e'], 2 )
+        self.assertEqual( self.dct['d']['e'], 2 )
+        del cp['a.b']
+        self.assertTrue( 'a.b.c' in self.cfg )
+        self.assertFalse( 'a.b.c' in cp )
+        with self.assertRaises(KeyError):
+            del cp['x.y']
+        self.assertFalse( 'x' in cp )
+
+    def test_scalar_on_path(self):
+        cfg = Configuration({'a' : 's'})
+        with self.assertRaises(KeyError):
+            cfg['a.x'] = 1
+        self.assertEqual( cfg['a'], 's' )
+
 class ConfigurationHierarchicalLookup(UT.TestCase):
     def setUp(self):
         self.cfg = Configuration({
@@ -96,6 +309,184 @@ class ConfigurationHierarchicalLookup(UT.TestCase):
         self.assertTrue( 'two.n-thirds' in self.cfg )
         self.assertFalse( 'two.n-fourths' in self.cfg )
 
+class CompiledPathAccessor(UT.TestCase):
+    def setUp(self):
+        self.dct = { 'one' : { 'two' : [ 'a', { 'b' : 'c' } ] }
+                   , 'ints' : { 1 : 'int-keyed' } }
+
+    def test_get(self):
+        self.assertEqual( compiled_path('one.two.0').get(self.dct), 'a' )
+        self.assertEqual( compiled_path('one.two.1.b').get(self.dct), 'c' )
+        self.assertEqual( compiled_path('ints.1').get(self.dct), 'int-keyed' )
+        with self.assertRaises(KeyError):
+            compiled_path('one.three').get(self.dct)
+        with self.assertRaises(KeyError):
+            compiled_path('one.two.5').get(self.dct)
+
+    def test_cached(self):
+        self.assertTrue( compiled_path('one.two') is compiled_path('one.two') )
+        self.assertFalse( compiled_path('one.two').isGlob )
+        self.assertTrue( compiled_path('one.*').isGlob )
+
+    def test_new_delete(self):
+        compiled_path('x.y.z').new(self.dct, 12)
+        self.assertEqual( self.dct['x']['y']['z'], 12 )
+        compiled_path('x.y.z').delete(self.dct)
+        self.assertFalse( compiled_path('x.y.z').has(self.dct) )
+        self.assertTrue( compiled_path('x.y').has(self.dct) )
+
+class ContextParseCache(EnvironmentMixin, UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.set_environ(gParseCacheDirEnvVar, self.cacheDir)
+        self.ctxPath = os.path.join(self.tmpDir, 'ctx.yaml')
+        with open(self.ctxPath, 'w') as f:
+            f.write('one: 1\ntwo: [a, b]\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_cached(self):
+        self.assertEqual( parse_context_stream(self.ctxPath), {'one' : 1, 'two' : ['a', 'b']} )
+        self.assertEqual( 1, len(os.listdir(self.cacheDir)) )
+        parsed = []
+        c = ParseCache().get( self.ctxPath, 'yaml:' + gYAMLLoader.__name__
+                            , lambda p: parsed.append(p) )
+        self.assertFalse( parsed )  # parser must not be invoked
+        self.assertEqual( c['one'], 1 )
+
+    def test_invalidated_on_change(self):
+        parse_context_stream(self.ctxPath)
+        with open(self.ctxPath, 'w') as f:
+            f.write('one: 2\n')
+        os.utime(self.ctxPath, ns=(0, 10**9))
+        self.assertEqual( parse_context_stream(self.ctxPath), {'one' : 2} )
+
+    def test_eviction(self):
+        pc = ParseCache(maxSize=0)
+        pc.get(self.ctxPath, 'test', lambda p: {'foo' : 'bar'})
+        self.assertFalse( [e for e in os.listdir(self.cacheDir) if e.endswith('.pickle')] )
+
+    def test_disabled(self):
+        os.environ[gParseCacheDirEnvVar] = ''
+        self.assertFalse( ParseCache().enabled )
+        parse_context_stream(self.ctxPath)
+        self.assertFalse( os.path.exists(self.cacheDir) )
+        # opt-in: disabled unless the location is given
+        del os.environ[gParseCacheDirEnvVar]
+        self.assertFalse( ParseCache().enabled )
+
+class ContextIncludes(EnvironmentMixin, UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.set_environ(gParseCacheDirEnvVar, self.cacheDir)
+        os.makedirs(os.path.join(self.tmpDir, 'geom'))
+        self._write( 'geom/detectors.yaml', 'dets: !include parts/dets.yaml\n' )
+        os.makedirs(os.path.join(self.tmpDir, 'geom', 'parts'))
+        self._write( 'geom/parts/dets.yaml', '[ECAL, HCAL]\n' )
+        self._write( 'a.yaml', 'geometry: !include geom/detectors.yaml\n' )
+        self._write( 'b.yaml', 'other: !include geom/detectors.yaml\n' )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _write(self, name, content, mtime=None):
+        path = os.path.join(self.tmpDir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, ns=(0, mtime))
+        return path
+
+    def test_relative_cached(self):
+        from lamia.core.interpolation import gIncludes
+        a = parse_context_stream(os.path.join(self.tmpDir, 'a.yaml'))
+        b = parse_context_stream(os.path.join(self.tmpDir, 'b.yaml'))
+        self.assertEqual( {'dets' : ['ECAL', 'HCAL']}, a['geometry'] )
+        self.assertEqual( a['geometry'], b['other'] )
+        # parsed once, copied for the including documents
+        self.assertIn( os.path.realpath(os.path.join(self.tmpDir, 'geom/detectors.yaml'))
+                     , gIncludes._cache )
+        self.assertIsNot( a['geometry'], b['other'] )
+        deps = gIncludes.dependencies(os.path.join(self.tmpDir, 'a.yaml'))
+        self.assertEqual( { os.path.realpath(os.path.join(self.tmpDir, p)) \
+                            for p in ('geom/detectors.yaml', 'geom/parts/dets.yaml') }
+                        , deps )
+
+    def test_modified_include(self):
+        import yaml
+        from lamia.core.interpolation import gIncludes, gIncludeLoader
+        aPath = os.path.join(self.tmpDir, 'a.yaml')
+        def _load():
+            with gIncludes.parsing(aPath), open(aPath) as f:
+                return yaml.load(f, Loader=gIncludeLoader)
+        _load()['geometry'].pop('dets')
+        self.assertEqual( ['ECAL', 'HCAL'], _load()['geometry']['dets'] )
+
+    def test_invalidated_on_nested_change(self):
+        aPath = os.path.join(self.tmpDir, 'a.yaml')
+        self.assertEqual( ['ECAL', 'HCAL'], parse_context_stream(aPath)['geometry']['dets'] )
+        self._write( 'geom/parts/dets.yaml', '[ECAL, HCAL, MM]\n', mtime=10**9 )
+        # both the include cache and the parse cache entry are invalidated
+        self.assertEqual( ['ECAL', 'HCAL', 'MM'], parse_context_stream(aPath)['geometry']['dets'] )
+
+    def test_recursive(self):
+        self._write( 'geom/parts/dets.yaml', '!include ../detectors.yaml\n' )
+        with self.assertRaises(RecursionError):
+            parse_context_stream(os.path.join(self.tmpDir, 'a.yaml'))
+
+class ContextLazySections(EnvironmentMixin, UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.set_environ(gParseCacheDirEnvVar, os.path.join(self.tmpDir, 'cache'))
+        self.set_environ(gLazySectionsMinSizeEnvVar, '0')
+        with open(os.path.join(self.tmpDir, 'ctx.yaml'), 'w') as f:
+            f.write('---\nruns:\n  - 1\n  - 2\n# comment\ncalib: {a: 1}\n')
+        with open(os.path.join(self.tmpDir, 'ctx.json'), 'w') as f:
+            f.write('{"runs" : [1, 2], "calib" : {"a" : 1}}')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_lazy_sections(self):
+        for fmt in ('yaml', 'json'):
+            for _ in range(2):  # second time from the cache
+                c = parse_context_stream( os.path.join(self.tmpDir, 'ctx.' + fmt) )
+                self.assertEqual( set(c.keys()), {'runs', 'calib'} )
+                self.assertTrue( all(type(v) is LazySection for v in c.values()) )
+                cfg = Configuration(c)
+                self.assertEqual( cfg['calib.a'], 1 )
+                self.assertFalse( hasattr(c['runs'], '_value') )
+                self.assertEqual( cfg['runs'], [1, 2] )
+
+    def test_relative_paths(self):
+        os.makedirs(os.path.join(self.tmpDir, 'sub'))
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        for fmt in ('yaml', 'json'):
+            os.chdir(self.tmpDir)
+            c = parse_context_stream( 'ctx.' + fmt )
+            self.assertEqual( Configuration(c)['calib.a'], 1 )
+            # cached index is used from another directory
+            os.chdir(os.path.join(self.tmpDir, 'sub'))
+            c = parse_context_stream( os.path.join('..', 'ctx.' + fmt) )
+            self.assertEqual( Configuration(c)['runs'], [1, 2] )
+
+    def test_references(self):
+        with open(os.path.join(self.tmpDir, 'ctx.yaml'), 'w') as f:
+            f.write('one: {a: $(value:two.b)}\ntwo: {b: $(value:three)}\nthree: x\n')
+        cfg = Configuration(parse_context_stream( os.path.join(self.tmpDir, 'ctx.yaml') ))
+        self.assertEqual( cfg.resolve_references(), ['two.b', 'one.a'] )
+        self.assertEqual( cfg['one.a'], 'x' )
+
+    def test_fallback(self):
+        with open(os.path.join(self.tmpDir, 'ctx.yaml'), 'w') as f:
+            f.write('one: &anchor [1, 2]\ntwo: *anchor\n')
+        c = parse_context_stream( os.path.join(self.tmpDir, 'ctx.yaml') )
+        self.assertEqual( c, {'one' : [1, 2], 'two' : [1, 2]} )
+
 #
 # Stacked Confs
 
@@ -177,6 +568,23 @@ class ConfigurationStackTest(UT.TestCase):
         self.assertEqual( orig['uno'], 1 )
         self.stack.pop()
 
+    def test_orig_nested_preserved(self):
+        # read values are read-only, their copies may be modified by the
+        # caller (e.g. the task's parameters descriptions get user defaults)
+        orig = { 'v' : { 'type' : str }, 'w' : { 'x' : [1] } }
+        for n, d in ConfigurationStack([orig]).items():
+            with self.assertRaises(TypeError):
+                d['default'] = 'u'
+            d = dict(d)
+            d['default'] = 'u'
+        self.assertEqual( orig, { 'v' : { 'type' : str }, 'w' : { 'x' : [1] } } )
+        stk = ConfigurationStack([orig])
+        with self.assertRaises(TypeError):
+            stk['w']['x'].append(2)
+        copy.deepcopy(stk['w'])['x'].append(2)
+        self.assertEqual( stk['w.x'], [1] )
+        self.assertEqual( orig['w']['x'], [1] )
+
     def test_orig_cfg_preserved(self):
         origDct = { 'uno' : 1, 'dos' : 2, 'tres' : 3 }
         origCfg = Configuration( origDct )
@@ -185,3 +593,490 @@ class ConfigurationStackTest(UT.TestCase):
         self.assertEqual( origDct['uno'], 1 )
         self.assertEqual( origCfg['uno'], 1 )
         self.stack.pop()
+
+class ConfigurationStackIndex(UT.TestCase):
+    def setUp(self):
+        self.stack = ConfigurationStack([ {'base' : 0, 'nested' : {'a' : 1}} ])
+        for n in range(50):
+            self.stack.push( {'layer%d'%n : n, 'top' : n}, tag='l%d'%n )
+
+    def test_deep_lookup(self):
+        self.assertEqual( self.stack['base'], 0 )
+        self.assertEqual( self.stack['top'], 49 )
+        self.assertEqual( self.stack['nested.a'], 1 )
+        self.assertEqual( len(self.stack), 53 )
+
+    def test_pop_restores(self):
+        self.stack.pop(tag='l49')
+        self.assertEqual( self.stack['top'], 48 )
+        self.assertFalse( 'layer49' in self.stack )
+        self.assertEqual( len(self.stack), 52 )
+
+    def test_tombstones(self):
+        del self.stack['base']
+        self.assertFalse( 'base' in self.stack )
+        self.assertFalse( 'base' in set(self.stack) )
+        self.assertEqual( len(self.stack), 52 )
+        self.stack['base'] = 'again'
+        self.assertEqual( self.stack['base'], 'again' )
+        del self.stack['nested']
+        self.assertFalse( 'nested.a' in self.stack )
+        with self.assertRaises(KeyError):
+            self.stack['nested.a']
+        with self.assertRaises(KeyError):
+            del self.stack['nested.a']
+        self.assertFalse( 'nested' in self.stack )
+        self.stack.pop(tag='l49')
+        self.assertEqual( self.stack['base'], 0 )
+        self.assertEqual( self.stack['nested.a'], 1 )
+
+class ConfigurationStackFreeze(UT.TestCase):
+    def setUp(self):
+        self.stack = ConfigurationStack([
+                { 'a' : { 'x' : 1, 'y' : [1, 2] }, 'b' : 'bee', 'c' : 'sea' },
+                { 'a' : { 'z' : '$(value:b)' }, 'b' : 'B', 'c' : None },
+            ])
+        del self.stack['c']
+
+    def test_merged(self):
+        f = self.stack.freeze()
+        self.assertEqual( f['a.x'], 1 )
+        self.assertEqual( f['a.z'], 'B' )
+        self.assertEqual( f['a.y'], (1, 2) )
+        self.assertEqual( set(f.keys()), {'a', 'b'} )
+        self.assertFalse( 'c' in f )
+
+    def test_immutable_hashable(self):
+        f = self.stack.freeze()
+        with self.assertRaises(TypeError):
+            f['a']['x'] = 2
+        self.assertEqual( hash(f), hash(self.stack.freeze()) )
+        self.assertEqual( f, self.stack.freeze() )
+        self.stack['b'] = 'other'
+        self.assertNotEqual( f, self.stack.freeze() )
+
+    def test_overlay(self):
+        f = self.stack.freeze()
+        o = f.overlay({'b' : 'overlaid'})
+        o['a.x'] = 12
+        self.assertEqual( o['b'], 'overlaid' )
+        self.assertEqual( o['a.x'], 12 )
+        self.assertEqual( o['a.y'], (1, 2) )
+        self.assertEqual( f['a.x'], 1 )
+        self.assertEqual( f['b'], 'B' )
+
+class ConfigurationLookupStats(UT.TestCase):
+    def setUp(self):
+        self.stack = ConfigurationStack([
+                { 'a' : { 'x' : 1 }, 'b' : 'bee' },
+                { 'c' : '$(value:d)-$(value:d)', 'd' : 'dee' },
+            ])
+        self.stack.push( {'a' : {'y' : 2}}, tag='top' )
+        self.stats = enable_stats()
+
+    def tearDown(self):
+        disable_stats()
+
+    def test_layers(self):
+        self.stack['a.x']
+        self.stack['a.y']
+        self.stack['b']
+        with self.assertRaises(KeyError):
+            self.stack['nope']
+        layers = self.stats.layers
+        self.assertEqual( layers[(0, 'top')], [2, 1, 1] )
+        self.assertEqual( layers[(2, None)], [2, 2, 0] )
+        self.assertEqual( layers[(None, None)], [1, 0, 1] )
+        self.assertEqual( self.stats.keys['a.x'], 1 )
+
+    def test_interpolations(self):
+        self.stack['c']
+        self.stack['c']
+        self.assertEqual( self.stats.interpolations['value'], 2 )
+        # the referenced entry is memoized as well (looked up once)
+        self.assertEqual( self.stats.memo, [1, 2] )
+        self.assertGreater( self.stats.interpolationTime, 0. )
+        self.assertIn( 'value', self.stats.report() )
+
+class ConfigurationStackSnapshot(UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.stack = ConfigurationStack([
+                ({ 'a' : { 'x' : 1, 'y' : '$(value:b)' }, 'b' : 'bee', 'c' : 3 }, 'base'),
+                ({ 'a' : { 'z' : 2 }, 'b' : 'B' }, 'over'),
+            ])
+        del self.stack['c']
+        self.path = os.path.join(self.tmpDir, 'stack.lsnap')
+        self.stack.dump_snapshot(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_stack_restored(self):
+        stk = ConfigurationStack(self.path)
+        self.assertEqual( stk['a.x'], 1 )
+        self.assertEqual( stk['a.y'], 'bee' )
+        self.assertEqual( stk['b'], 'B' )
+        self.assertFalse( 'c' in stk )
+        stk.pop(tag='over')
+        self.assertEqual( stk['c'], 3 )
+        stk = compose_stack([self.path], ['a.x=defined'])
+        self.assertEqual( stk['a.x'], 'defined' )
+        self.assertEqual( stk['a.z'], 2 )
+
+    def test_configuration_merged(self):
+        cfg = Configuration(self.path)
+        self.assertEqual( cfg['a.z'], 2 )
+        self.assertEqual( cfg['a.x'], 1 )
+        self.assertEqual( cfg['a.y'], 'B' )
+        self.assertFalse( 'c' in cfg )
+
+    def test_signature(self):
+        otherPath = os.path.join(self.tmpDir, 'stack.bin')
+        shutil.copy(self.path, otherPath)
+        self.assertIs( type(parse_context_stream(otherPath)), StackSnapshot )
+        with open(otherPath, 'r+b') as f:
+            f.write(b'X')
+        with self.assertRaises(RuntimeError):
+            StackSnapshot.load(otherPath)
+
+class ConfigurationStackApply(UT.TestCase):
+    def setUp(self):
+        self.stack = ConfigurationStack([
+                { 'one' : 1, 'two' : '$(value:one)', 'broken' : '$(unknown:x)' },
+                { 'two' : 2, 'three' : 3 }
+            ])
+
+    def test_consumed_only(self):
+        def _f(one, two, four=4, *, three):
+            return (one, two, three, four)
+        # the "broken" entry is not consumed, so not interpolated
+        self.assertEqual( self.stack.apply(_f), (1, 2, 3, 4) )
+        self.assertEqual( self.stack.apply(_f), (1, 2, 3, 4) )
+
+    def test_bound_method(self):
+        class _C(object):
+            def f(self, one, five=5):
+                return (self, one, five)
+        o = _C()
+        self.assertEqual( self.stack.apply(o.f), (o, 1, 5) )
+        with self.assertRaises(TypeError):
+            self.stack.apply(_C.f)
+
+    def test_kwargs_materialized(self):
+        def _f(one, **kwargs):
+            return kwargs
+        with self.assertRaises(KeyError):
+            self.stack.apply(_f)
+        del self.stack['broken']
+        self.assertEqual( self.stack.apply(_f), {'two' : 2, 'three' : 3} )
+
+class ConfigurationSectionAccessor(UT.TestCase):
+    def setUp(self):
+        self.Accessor = section_accessor( 'TestAccessor', {
+                'exe' : ('execs.submit', str),
+                'args' : ('submit', dict, {}),
+                'timeout' : ('timeouts.submit', (int, float), 30)
+            })
+        self.stack = ConfigurationStack([
+                { 'execs' : { 'submit' : '$(value:prefix)/submit' }
+                , 'prefix' : '/usr/bin' },
+                { 'submit' : { 'q' : 'short' } }
+            ])
+
+    def test_values(self):
+        a = self.Accessor.from_config(self.stack)
+        self.assertEqual( a.exe, '/usr/bin/submit' )
+        self.assertEqual( a.args, {'q' : 'short'} )
+        self.assertEqual( a.timeout, 30 )
+        with self.assertRaises(AttributeError):
+            a.other = 1
+
+    def test_validation(self):
+        self.stack['timeouts.submit'] = 'long'
+        with self.assertRaises(SchemaValidationError):
+            self.Accessor.from_config(self.stack)
+        del self.stack['execs']
+        with self.assertRaises(SchemaValidationError):
+            self.Accessor.from_config(self.stack)
+
+class ConfigurationDeltaEncoding(UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.base = ConfigurationStack([
+                { 'paths' : { 'out' : '/data/$(value:run)', 'tmp' : '/tmp' }
+                , 'runs' : { 1 : 'a', 2 : 'b' }
+                , 'big' : { str(n) : n for n in range(1000) }
+                , 'run' : '0' },
+                { 'big' : { '10' : 'ten' } },
+            ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _target(self):
+        t = ConfigurationStack([ (c, tag) for tag, c in self.base._stack ])
+        t.push( { 'run' : '42', 'paths' : { 'log' : 'x.log' } }, tag='job' )
+        del t['paths.tmp']
+        return t
+
+    def test_minimal(self):
+        d = compute_delta(self.base, self._target())
+        self.assertEqual( d.set, {('run',) : '42', ('paths', 'log') : 'x.log'} )
+        self.assertEqual( d.deleted, [('paths', 'tmp')] )
+        self.assertFalse( compute_delta(self.base, self.base) )
+
+    def test_stack_apply(self):
+        d = compute_delta(self.base, self._target())
+        path = os.path.join(self.tmpDir, 'job.ldelta')
+        d.dump(path)
+        self.assertEqual( ConfigurationDelta.load(path), d )
+        stk = apply_delta(self.base, ConfigurationDelta.load(path), tag='job')
+        self.assertEqual( stk.freeze(), self._target().freeze() )
+        self.assertEqual( stk['paths.out'], self._target()['paths.out'] )
+        self.assertEqual( stk['paths.log'], 'x.log' )
+        self.assertFalse( 'paths.tmp' in stk )
+        self.assertEqual( stk['big.10'], 'ten' )
+        self.assertEqual( self.base['run'], '0' )
+        # top-level entries are retrieved whole
+        self.assertEqual( stk['paths'], { 'out' : '/data/0', 'log' : 'x.log' } )
+        self.assertEqual( stk.view()['paths']['out'], '/data/0' )
+        self.assertEqual( stk['big']['10'], 'ten' )
+        # delta files may be pushed to the stack by path as well
+        stk = ConfigurationStack([(c, tag) for tag, c in self.base._stack] + [path])
+        self.assertEqual( stk['run'], '42' )
+
+    def test_nested_stack_apply(self):
+        base = ConfigurationStack([{ 'a' : { 'x' : 1, 'y' : 2, 'z' : 5 } }])
+        d = compute_delta(base, { 'a' : { 'x' : 1, 'y' : 3 } })
+        stk = apply_delta(base, d)
+        self.assertEqual( stk['a'], { 'x' : 1, 'y' : 3 } )
+        self.assertFalse( 'a.z' in stk )
+        self.assertEqual( stk.freeze()['a'], { 'x' : 1, 'y' : 3 } )
+        del base['a']
+        d = compute_delta({ 'a' : { 'x' : 1 }, 'b' : 1 }, { 'b' : 1 })
+        self.assertFalse( 'a' in apply_delta(base, d) )
+
+    def test_configuration_apply(self):
+        base = { 'a' : { 'b' : 1, 'c' : [1, 2] }, 'runs' : { 1 : 'one' } }
+        target = { 'a' : { 'c' : [1, 2, 3] }, 'runs' : { 1 : 'one', 2 : 'two' } }
+        d = compute_delta(base, target)
+        cfg = apply_delta(base, d)
+        self.assertEqual( dict(cfg), target )
+        self.assertEqual( base['a'], { 'b' : 1, 'c' : [1, 2] } )
+
+class ConfigurationGlobSearch(UT.TestCase):
+    def setUp(self):
+        self.cfg = Configuration({
+                'runs' : { str(n) : { 'detectors' : {
+                                'ecal' : { 'enabled' : n%2 == 0 },
+                                'hcal' : { 'enabled' : '$(value:default)' } } }
+                           for n in range(5) },
+                'default' : 'yes',
+                'list' : [ { 'enabled' : False } ]
+            })
+
+    def test_search(self):
+        r = self.cfg.search('runs.*.detectors.*.enabled')
+        self.assertEqual( len(r), 10 )
+        self.assertEqual( r['runs.2.detectors.hcal.enabled'], 'yes' )
+        self.assertIs( r['runs.1.detectors.ecal.enabled'], False )
+        self.assertEqual( set(self.cfg.search('runs.[12].detectors.ecal.*').keys())
+                        , {'runs.1.detectors.ecal.enabled', 'runs.2.detectors.ecal.enabled'} )
+        self.assertEqual( set(self.cfg.search('**.enabled').keys())
+                        , set(r.keys()) | {'list.0.enabled'} )
+        self.assertEqual( self.cfg.search('nope.*'), {} )
+
+    def test_invalidation(self):
+        self.assertEqual( len(self.cfg.search('runs.*.detectors.ecal.enabled')), 5 )
+        self.cfg['runs.5.detectors.ecal.enabled'] = True
+        self.assertEqual( len(self.cfg.search('runs.*.detectors.ecal.enabled')), 6 )
+        del self.cfg['runs.0']
+        self.assertEqual( len(self.cfg.search('runs.*.detectors.ecal.enabled')), 5 )
+        self.cfg['default'] = 'no'
+        self.assertEqual( self.cfg.search('runs.*.detectors.hcal.enabled')['runs.1.detectors.hcal.enabled'], 'no' )
+
+    def test_getitem(self):
+        self.assertEqual( self.cfg['runs.3.detectors.h*.enabled'], 'yes' )
+        self.assertTrue( 'runs.*.detectors' in self.cfg )
+        self.assertFalse( 'runs.*.nope' in self.cfg )
+        with self.assertRaises(ValueError):
+            self.cfg['runs.*.detectors']
+        with self.assertRaises(KeyError):
+            self.cfg['runs.*.nope']
+
+class ConfigurationConcurrentLoading(EnvironmentMixin, UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.paths = []
+        for n in range(5):
+            path = os.path.join(self.tmpDir, 'ctx%d.yaml'%n)
+            with open(path, 'w') as f:
+                f.write( 'layer: %d\nl%d: {n: %d}\n'%(n, n, n) )
+            self.paths.append(path)
+        self.set_environ(gParseCacheDirEnvVar, None)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _check(self, stk):
+        self.assertEqual( stk['layer'], 4 )
+        self.assertEqual( [stk['l%d.n'%n] for n in range(5)], list(range(5)) )
+        stk.pop(tag='two')
+        self.assertEqual( stk['layer'], 3 )
+        stk.pop()
+        self.assertEqual( stk['layer'], 2 )
+        self.assertFalse( 'l3' in stk )
+
+    def test_threads(self):
+        ctx = self.paths[:4] + [(self.paths[4], 'two')]
+        self._check( compose_stack(ctx, workers=4) )
+        self._check( compose_stack(ctx, workers=1) )
+
+    def test_processes(self):
+        ctx = self.paths[:4] + [(self.paths[4], 'two')]
+        self._check( compose_stack(ctx, workers=2, processes=True) )
+
+class ConfigurationFingerprint(UT.TestCase):
+    def setUp(self):
+        self.data = { 'a' : { 'x' : 1, 'y' : [1, 2, {'z' : 'zed'}] }
+                    , 'b' : 'bee'
+                    , 'runs' : { str(n) : { 'n' : n } for n in range(100) } }
+
+    def _fresh(self, cfg):
+        return Configuration(copy.deepcopy(dict(cfg._store))).fingerprint()
+
+    def test_stable(self):
+        cfg = Configuration(self.data)
+        other = Configuration(dict(reversed(list(copy.deepcopy(self.data).items()))))
+        self.assertEqual( cfg.fingerprint(), other.fingerprint() )
+        self.assertEqual( cfg.fingerprint('a'), other.fingerprint('a') )
+        self.assertNotEqual( cfg.fingerprint('a'), cfg.fingerprint('runs') )
+        with self.assertRaises(KeyError):
+            cfg.fingerprint('nope')
+
+    def test_incremental(self):
+        cfg = Configuration(self.data)
+        fp0, fpA = cfg.fingerprint(), cfg.fingerprint('a')
+        cfg['runs.5.n'] = 'five'
+        self.assertNotEqual( cfg.fingerprint(), fp0 )
+        self.assertEqual( cfg.fingerprint(), self._fresh(cfg) )
+        self.assertEqual( cfg.fingerprint('a'), fpA )
+        cfg['runs.200'] = { 'n' : 200 }
+        del cfg['runs.1']
+        cfg['a.y.2.z'] = 'Z'
+        cfg['b'] = 'B'
+        self.assertEqual( cfg.fingerprint(), self._fresh(cfg) )
+        self.assertNotEqual( cfg.fingerprint('a'), fpA )
+        cfg['runs.5.n'] = 5
+        cfg['runs.1'] = { 'n' : 1 }
+        del cfg['runs.200']
+        cfg['a.y.2.z'] = 'zed'
+        cfg['b'] = 'bee'
+        self.assertEqual( cfg.fingerprint(), fp0 )
+        # original data is intact
+        self.assertEqual( Configuration(self.data).fingerprint(), fp0 )
+
+    def test_stack(self):
+        stk = ConfigurationStack([ (self.data, 'base') ])
+        fp0, fpA = stk.fingerprint(), stk.fingerprint('a')
+        stk.push( { 'b' : 'other' }, tag='top' )
+        self.assertNotEqual( stk.fingerprint(), fp0 )
+        self.assertEqual( stk.fingerprint('a'), fpA )
+        del stk['a.x']
+        self.assertNotEqual( stk.fingerprint('a'), fpA )
+        stk.pop(tag='top')
+        self.assertEqual( stk.fingerprint(), fp0 )
+        self.assertEqual( stk.fingerprint('a'), fpA )
+
+
+class ConfigurationStackView(UT.TestCase):
+    def setUp(self):
+        self.stk = ConfigurationStack([ ({ 'one' : 1, 'sub' : { 'two' : 2 } }, 'base')
+                                      , ({ 'three' : '$(value:four)', 'four' : 'IV' }, 'top') ])
+
+    def test_lazy_view(self):
+        view = self.stk.view()
+        self.assertEqual( set(view), {'one', 'sub', 'three', 'four'} )
+        self.assertEqual( 4, len(view) )
+        self.assertEqual( 'IV', view['three'] )
+        self.assertEqual( ['three'], list(view._resolved.keys()) )
+        self.assertIn( 'sub', view )
+        self.assertNotIn( 'five', view )
+        with self.assertRaises(KeyError):
+            view['five']
+        with self.assertRaises(TypeError):
+            view['one'] = 2
+
+    def test_shared_layers(self):
+        cp = ConfigurationStack(self.stk)
+        self.assertIs( cp._stack[0][1], self.stk._stack[0][1] )
+        cp.push( { 'one' : 'uno' }, tag='hook' )
+        self.assertEqual( 'uno', cp['one'] )
+        self.assertEqual( 1, self.stk['one'] )
+        cp.pop(tag='hook')
+        # writes to the shared top layer copy it first, in both stacks
+        cp['sub.two'] = 'dos'
+        del cp['four']
+        self.stk['one'] = 'eins'
+        self.assertEqual( 'dos', cp['sub.two'] )
+        self.assertNotIn( 'four', cp )
+        self.assertEqual( 1, cp['one'] )
+        self.assertEqual( 2, self.stk['sub.two'] )
+        self.assertEqual( 'IV', self.stk['four'] )
+        self.assertEqual( 'eins', self.stk['one'] )
+        self.assertIsNot( cp._stack[-1][1], self.stk._stack[-1][1] )
+        self.assertIs( cp._stack[0][1], self.stk._stack[0][1] )
+
+class ConfigurationStackLocalOverlays(UT.TestCase):
+    def setUp(self):
+        self.stk = ConfigurationStack([ { 'one' : 1, 'sub' : { 'two' : 2 }, 'gone' : 0 } ])
+
+    def test_overlay(self):
+        stk = self.stk
+        stk.push_local( { 'one' : 'uno', 'sub' : { 'three' : 3 } }, tag='local' )
+        self.assertEqual( 'uno', stk['one'] )
+        self.assertEqual( 3, stk['sub.three'] )
+        self.assertEqual( 2, stk['sub.two'] )
+        stk['four'] = 4
+        del stk['gone']
+        self.assertNotIn( 'gone', stk )
+        self.assertEqual( {'one', 'sub', 'four'}, set(stk) )
+        self.assertEqual( 3, len(stk) )
+        self.assertEqual( 4, ConfigurationStack(stk)['four'] )
+        with self.assertRaises(StackTagError):
+            stk.pop_local(tag='other')
+        stk.pop_local(tag='local')
+        self.assertEqual( 1, stk['one'] )
+        self.assertEqual( 0, stk['gone'] )
+        self.assertNotIn( 'four', stk )
+        self.assertEqual( 0, stk._nLocal )
+        with self.assertRaises(StackTagError):
+            stk.pop_local(tag='local')
+
+    def test_threads(self):
+        import concurrent.futures, threading
+        barrier = threading.Barrier(4)
+        def _worker(n):
+            self.stk.push_local( { 'one' : n }, tag='w' )
+            try:
+                barrier.wait()
+                return self.stk['one']
+            finally:
+                self.stk.pop_local(tag='w')
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            self.assertEqual( [0, 1, 2, 3], list(pool.map(_worker, range(4))) )
+        self.assertEqual( 1, self.stk['one'] )
+
+    def test_asyncio(self):
+        import asyncio
+        async def _task(n):
+            self.stk.push_local( { 'sub' : { 'two' : n } }, tag='t' )
+            await asyncio.sleep(0)
+            v = self.stk['sub.two']
+            self.stk.pop_local(tag='t')
+            return v
+        async def _main():
+            return await asyncio.gather( *[_task(n) for n in range(5)] )
+        self.assertEqual( list(range(5)), asyncio.run(_main()) )
+        self.assertEqual( 2, self.stk['sub.two'] )
@@ -2,10 +2,13 @@
 Tests the filesystem routines within Lamia
 """
 
-import os, shutil
+import os, shutil, tempfile
 import unittest as UT
-from lamia.core.filesystem import Paths, rxFSStruct, dict_product, \
+from lamia.core.filesystem import Paths, rxFSStruct, dict_product, DictProduct, \
                                   render_path_templates
+from lamia.core.configuration import parse_context_stream, gParseCacheDirEnvVar
+import lamia.core.tables
+from tests import EnvironmentMixin
 
 class TestLamiaFilesystemTemplates(UT.TestCase):
     def setUp(self):
@@ -108,6 +111,46 @@ class TestLamiaDictProducts(UT.TestCase):
             wasThere = True
         self.assertTrue(wasThere)
 
+    def test_product_size(self):
+        p = dict_product( a=[1, 2, 3], b=('x', 'y'), c=1 )
+        self.assertEqual( p.product_size(), 6 )
+        self.assertEqual( len(p), 6 )
+        self.assertEqual( len(list(p)), 6 )
+        self.assertEqual( dict_product().product_size(), 1 )
+        self.assertEqual( dict_product( a=[] ).product_size(), 0 )
+        self.assertFalse( list(dict_product( a=[], b=[1, 2] )) )
+        self.assertIsNone( dict_product( a=[1, 2], f=lambda d: d['a'] ).product_size() )
+
+    def test_order_and_copies(self):
+        rs = list(dict_product( a=[1, 2], b=['x', 'y'] ))
+        self.assertEqual( rs, [ {'a':1, 'b':'x'}, {'a':1, 'b':'y'}
+                              , {'a':2, 'b':'x'}, {'a':2, 'b':'y'} ] )
+        # shared state is yielded as is
+        p = DictProduct( {'a' : [1, 2], 'b' : 3}, shared=True )
+        ids = set( id(r) for r in p )
+        self.assertEqual( len(ids), 1 )
+
+    def test_nested(self):
+        rs = list(dict_product( a=[1, [2, (3, 4)]] ))
+        self.assertEqual( [r['a'] for r in rs], [1, 2, 3, 4] )
+        p = dict_product( a=[1, 2], run={ 'n' : [10, 20], 'x' : 'z' } )
+        self.assertEqual( p.product_size(), 4 )
+        rs = list(p)
+        self.assertEqual( len(rs), 4 )
+        self.assertIn( {'a' : 2, 'run' : {'n' : 20, 'x' : 'z'}}, rs )
+        p = dict_product( run=[{'n' : [1, 2]}, {'n' : 3}] )
+        self.assertEqual( p.product_size(), 3 )
+        self.assertEqual( [r['run']['n'] for r in p], [1, 2, 3] )
+        with self.assertRaises(TypeError):
+            list(dict_product( a=[1, None] ))
+
+    def test_callables(self):
+        rs = list(dict_product( a=[1, 2]
+                              , b=lambda d: [d['a']*10, d['a']*10 + 1]
+                              , c=lambda d: (lambda dd: dd['a'] + 100) ))
+        self.assertEqual( [ (r['a'], r['b'], r['c']) for r in rs ]
+                        , [ (1, 10, 101), (1, 11, 101), (2, 20, 102), (2, 21, 102) ] )
+
 class TestLamiaPathInterp(UT.TestCase):
     def setUp(self):
         self.template = [ 'root', 'iter#{itNo}', 'subFile.{sfID}' ]
@@ -133,3 +176,55 @@ class TestLamiaPathInterp(UT.TestCase):
             self.assertTrue( p not in met )
             met.add( p )
         self.assertEqual( len(met), 2 )
+
+class TestLamiaTabularProducts(EnvironmentMixin, UT.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.set_environ(gParseCacheDirEnvVar, None)
+        with open(os.path.join(self.tmpDir, 'runs.csv'), 'w') as f:
+            f.write( 'number,type,energy,id,gain,tag\n'
+                     '101,phys,1.5,007,1,1\n'
+                     '102,calib,2,10,,2\n'
+                     '103,phys,2.5,0,2.5,x\n' )
+        with open(os.path.join(self.tmpDir, 'runs.jsonl'), 'w') as f:
+            f.write('{"number": 101, "type": "phys"}\n{"number": 102}\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_csv(self):
+        t = parse_context_stream(os.path.join(self.tmpDir, 'runs.csv'))['runs']
+        self.assertEqual( t.nRows, 3 )
+        self.assertEqual( list(t['number']), [101, 102, 103] )
+        self.assertEqual( t['energy'][1], 2.0 )
+        self.assertEqual( list(t['type']), ['phys', 'calib', 'phys'] )
+        self.assertEqual( list(t['id']), ['007', '10', '0'] )
+        self.assertIs( type(t['energy'].data[1]), float )
+        # columns with blank or non-numerical cell are kept as strings
+        self.assertEqual( list(t['gain']), ['1', '', '2.5'] )
+        self.assertEqual( list(t['tag']), ['1', '2', 'x'] )
+
+    def test_json_lines(self):
+        t = parse_context_stream(os.path.join(self.tmpDir, 'runs.jsonl'))['runs']
+        self.assertEqual( list(t['type']), ['phys', None] )
+
+    def test_zipped_product(self):
+        t = parse_context_stream(os.path.join(self.tmpDir, 'runs.csv'))['runs']
+        paths = set( p for p, _ in render_path_templates( 'it{itNo}'
+                            , '{runs[number]}-{runs[type]}'
+                            , runs=t, itNo=[1, 2] ) )
+        self.assertEqual( paths, set( 'it%d/%s'%(n, r) for n in (1, 2) \
+                    for r in ('101-phys', '102-calib', '103-phys') ) )
+        rows = list( dict_product(n=t['number'], e=t['energy'], x=['a', 'b']) )
+        self.assertEqual( len(rows), 6 )
+        self.assertIn( {'n' : 102, 'e' : 2.0, 'x' : 'b'}, rows )
+
+    @UT.skipUnless( lamia.core.tables.numpy, 'NumPy is not available' )
+    def test_npz(self):
+        numpy = lamia.core.tables.numpy
+        path = os.path.join(self.tmpDir, 'runs.npz')
+        numpy.savez(path, number=numpy.arange(3), w=numpy.ones(3))
+        t = parse_context_stream(path)['runs']
+        self.assertEqual( list(t['number']), [0, 1, 2] )
+        self.assertIs( type(t['number'][0]), int )
+
@@ -135,3 +135,177 @@ class ProcessorVarTypes_TestCase(UT.TestCase):
     def test_set_subst(self):
         self.assertEqual( self.chck['setHere'], self.pb['SMPL']['someSet'] )
 
+
+class ProcessorCompiledTemplates_TestCase(UT.TestCase):
+    def setUp(self):
+        self.pb = StringProc()
+        self.pb['SMPL'] = DictInterpolator(gSubstDict)
+        self.pb['NEST'] = DictInterpolator({ 'ref' : '$(SMPL:1)', 'name' : 'two'
+                                           , 'num' : '$(SMPL:fourtyTwo)' })
+
+    def test_segments(self):
+        from lamia.core.interpolation import compiled_template, Reference
+        self.assertEqual( ('no refs',), compiled_template('no refs') )
+        self.assertEqual( ('',), compiled_template('') )
+        segs = compiled_template('a $(SMPL:1)$(SMPL:two) b')
+        self.assertEqual( ('a ', ('SMPL', '1'), ('SMPL', 'two'), ' b'), segs )
+        self.assertIs( Reference, type(segs[1]) )
+        self.assertIs( segs, compiled_template('a $(SMPL:1)$(SMPL:two) b') )
+
+    def test_nested(self):
+        self.assertEqual( 'one-one', self.pb('$(NEST:ref)-$(SMPL:1)') )
+        self.assertEqual( '2', self.pb('$(SMPL:$(NEST:name))') )
+        self.assertEqual( 42, self.pb('$(NEST:num)') )
+
+    def test_many_refs(self):
+        self.assertEqual( 'one'*1000, self.pb('$(SMPL:1)'*1000) )
+
+    def test_extra_symbols(self):
+        with self.assertRaises(RuntimeError):
+            self.pb('$(SMPL:fourtyTwo) and more')
+        with self.assertRaises(RuntimeError):
+            self.pb('$(SMPL:natnums)$(SMPL:1)')
+
+    def test_tracked(self):
+        self.pb.tracked = set()
+        self.pb('$(NEST:ref) $(SMPL:two)')
+        self.assertEqual( {('NEST', 'ref'), ('SMPL', '1'), ('SMPL', 'two')}
+                        , self.pb.tracked )
+
+class CountingInterpolation(object):
+    def __init__(self, pure=False):
+        self.calls = []
+        self.pure = pure
+
+    def __call__(self, v):
+        self.calls.append(v)
+        return v.upper()
+
+class ProcessorMemoization_TestCase(UT.TestCase):
+    def setUp(self):
+        self.parent = StringProc()
+        self.pure = self.parent['PURE'] = CountingInterpolation(pure=True)
+        self.impure = self.parent['IMPR'] = CountingInterpolation()
+        self.pb = StringProc(parent=self.parent)
+
+    def test_pure(self):
+        for _ in range(3):
+            self.assertEqual( 'A-B-A', self.pb('$(PURE:a)-$(PURE:b)-$(PURE:a)') )
+            self.assertEqual( 'A', self.parent('$(IMPR:a)') )
+        self.assertEqual( ['a', 'b'], self.pure.calls )
+        self.assertEqual( ['a']*3, self.impure.calls )
+        # results are shared via the defining processor
+        self.assertEqual( 'A', StringProc(parent=self.parent)('$(PURE:a)') )
+        self.assertEqual( ['a', 'b'], self.pure.calls )
+
+    def test_pure_groups(self):
+        self.parent.pure.add('IMPR')
+        self.pb('$(IMPR:a)$(IMPR:a)')
+        self.assertEqual( ['a'], self.impure.calls )
+
+    def test_invalidate(self):
+        self.pb('$(PURE:a)$(PURE:b)')
+        self.pb.invalidate('PURE', 'a')
+        self.pb('$(PURE:a)$(PURE:b)')
+        self.assertEqual( ['a', 'b', 'a'], self.pure.calls )
+        self.pb.invalidate('PURE')
+        self.pb('$(PURE:b)')
+        self.assertEqual( ['a', 'b', 'a', 'b'], self.pure.calls )
+        self.parent['PURE'] = other = CountingInterpolation(pure=True)
+        self.pb('$(PURE:b)')
+        self.assertEqual( ['b'], other.calls )
+
+    def test_tracked(self):
+        self.pb('$(PURE:a)')
+        self.pb.tracked = set()
+        self.pb('$(PURE:a)')
+        self.assertEqual( {('PURE', 'a')}, self.pb.tracked )
+
+class ProcessorPlainSubtrees_TestCase(UT.TestCase):
+    def setUp(self):
+        from lamia.core.interpolation import PlainMarks
+        self.pb = StringProc()
+        self.pb['SMPL'] = DictInterpolator(gSubstDict)
+        self.marks = PlainMarks()
+        self.data = { 'plain' : { 'a' : [1, 2, {'b' : 'c'}], 's' : set(['x']) }
+                    , 'refs' : { 'plain' : ['no refs'], 'ref' : ['$(SMPL:1)'] } }
+
+    def test_plain(self):
+        r = self.pb(self.data, self.marks)
+        self.assertIs( r['plain'], self.data['plain'] )
+        self.assertIs( r['refs']['plain'], self.data['refs']['plain'] )
+        self.assertEqual( ['one'], r['refs']['ref'] )
+        self.assertIsNot( r['refs'], self.data['refs'] )
+        # without marks everything is copied
+        self.assertIsNot( self.pb(self.data)['plain'], self.data['plain'] )
+
+    def test_forget(self):
+        lst = self.data['plain']['a']
+        self.assertTrue( self.marks(lst) )
+        lst.append('$(SMPL:two)')
+        self.marks.forget(lst)
+        self.marks.forget(self.data['plain'])
+        self.assertEqual( [1, 2, {'b' : 'c'}, '2'], self.pb(self.data, self.marks)['plain']['a'] )
+
+class SlowInterpolation(object):
+    """
+    Mock I/O-bound interpolator: sleeps before returning the upper-cased
+    identifier.
+    """
+    ioBound = True
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.threads = set()
+
+    def __call__(self, v):
+        import time, threading
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        if 'fail' == v:
+            raise ValueError(v)
+        return v.upper()
+
+class ProcessorIOBound_TestCase(UT.TestCase):
+    def setUp(self):
+        self.pb = StringProc()
+        self.slow = self.pb['SLOW'] = SlowInterpolation()
+        self.pb['SMPL'] = DictInterpolator(gSubstDict)
+        self.data = { 'f%d'%n : '$(SLOW:f%d)/$(SMPL:1)'%n for n in range(10) }
+        self.data['list'] = ['$(SLOW:a)', '$(SLOW:$(SMPL:1))', 'plain']
+
+    def test_pending(self):
+        refs = self.pb.pending_references(self.data)
+        self.assertEqual( 11, len(refs) )
+        self.assertIn( ('SLOW', 'a'), refs )
+
+    def test_concurrent(self):
+        import time
+        t0 = time.time()
+        r = self.pb.resolve(self.data, workers=11)
+        self.assertLess( time.time() - t0, 0.3 )
+        self.assertGreater( len(self.slow.threads), 1 )
+        self.assertEqual( self.pb(self.data), r )
+        self.assertEqual( ['A', 'ONE', 'plain'], r['list'] )
+
+    def test_errors(self):
+        self.data['bad'] = '$(SLOW:fail)'
+        with self.assertRaises(ValueError):
+            self.pb.resolve(self.data, workers=4)
+
+    def test_tracked_per_thread(self):
+        import threading
+        barrier = threading.Barrier(2)
+        tracked = {}
+        def _track(n):
+            self.pb.tracked = refs = set()
+            barrier.wait()
+            self.pb('$(SLOW:t%d)'%n)
+            tracked[n] = (refs, self.pb.tracked)
+        ts = [ threading.Thread(target=_track, args=(n,)) for n in range(2) ]
+        for t in ts: t.start()
+        for t in ts: t.join()
+        for n in range(2):
+            self.assertEqual( {('SLOW', 't%d'%n)}, tracked[n][0] )
+            self.assertIs( tracked[n][0], tracked[n][1] )
+        self.assertIsNone( self.pb.tracked )
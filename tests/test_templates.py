@@ -46,3 +46,41 @@ class TemplatesTest(UT.TestCase):
     #    tc.push( {'a' : 'some', 'b' : 'other'} )
     #    self.t('test-ctx-stack')
 
+
+class TemplatesMappingRendering(UT.TestCase):
+    """
+    Rendering of templates with the configuration stack given as lazy mapping.
+    """
+    def setUp(self):
+        import jinja2
+        self.t = Templates( [TMPLTS_DIR], loaderInterpolators=LI.Processor() )
+        self.t.env.loader = jinja2.DictLoader({
+                'greeting' : '{{ greeting }}, {{ who.name }}{% for n in range(2) %}!{% endfor %}'
+            })
+        self.stk = LC.Stack([ { 'greeting' : 'Hello', 'who' : {'name' : 'world'} }
+                            , { 'huge' : { str(n) : n for n in range(1000) } } ])
+
+    def test_render_view(self):
+        view = self.stk.view()
+        self.assertEqual( 'Hello, world!!', self.t.render_mapping('greeting', view) )
+        # only the entries referenced by the template were retrieved
+        self.assertEqual( set(view._resolved.keys()), {'greeting', 'who'} )
+
+    def test_handler(self):
+        from lamia.core.templates import _RecursiveTemplatesHandler
+        import io
+        h = _RecursiveTemplatesHandler(renderers={'default' : self.t})
+        dest = io.StringIO()
+        h( {'id' : 'greeting', 'contextHooks' : ['override']}, dest
+         , context=self.stk
+         , contextHooks={'override' : {'greeting' : 'Hi'}} )
+        self.assertEqual( 'Hi, world!!', dest.getvalue() )
+        # the hooks were pushed on the copy sharing the layers
+        self.assertEqual( 'Hello', self.stk['greeting'] )
+        self.assertEqual( 2, len(self.stk._stack) )
+
+    def test_undefined(self):
+        import jinja2
+        self.t.env.loader.mapping['broken'] = '{{ missing }}'
+        with self.assertRaises(jinja2.exceptions.UndefinedError):
+            self.t.render_mapping('broken', self.stk.view())